@@ -5,8 +5,11 @@ Handles conversational input and intelligently routes tasks
 
 import asyncio
 import aiohttp
+import copy
+import hashlib
 import json
 import re
+from collections import OrderedDict
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
@@ -65,6 +68,10 @@ class AdvancedAIBrain:
             "active_character": None,
             "preferences": {}
         }
+        # Parsed intents by (context memory fingerprint, exact input text), oldest first;
+        # repeats skip the GPT-4 call. Parses that lean on earlier messages are not cached
+        self._intent_cache: OrderedDict = OrderedDict()
+        self.intent_cache_size = 256
         
     async def setup_session(self):
         """Initialize async session"""
@@ -89,6 +96,10 @@ class AdvancedAIBrain:
             "content": user_input
         })
         
+        cached = self._cached_intent(user_input)
+        if cached is not None:
+            return cached
+        
         # Build context-aware prompt for GPT-4
         system_prompt = self._build_understanding_prompt()
         
@@ -115,17 +126,12 @@ class AdvancedAIBrain:
                     understanding = json.loads(result["choices"][0]["message"]["content"])
                     
                     # Convert to ParsedIntent
-                    parsed = ParsedIntent(
-                        intent_type=IntentType(understanding.get("intent_type", "general_question")),
-                        confidence=understanding.get("confidence", 0.5),
-                        primary_action=understanding.get("primary_action", ""),
-                        entities=understanding.get("entities", {}),
-                        context=understanding.get("context", {}),
-                        requires_clarification=understanding.get("requires_clarification", False),
-                        clarification_questions=understanding.get("clarification_questions", [])
-                    )
+                    parsed = self._to_parsed_intent(understanding)
+                    
+                    # Only model answers are cached; fallbacks retry the API next time
+                    self._cache_intent(user_input, parsed)
                     
-                    return parsed
+                    return copy.deepcopy(parsed)
                 else:
                     # Fallback to pattern matching
                     return self._fallback_pattern_matching(user_input)
@@ -134,6 +140,111 @@ class AdvancedAIBrain:
             print(f"Understanding error: {e}")
             return self._fallback_pattern_matching(user_input)
     
+    async def understand_inputs(self, user_inputs: List[str]) -> List[Optional[ParsedIntent]]:
+        """
+        Understand several separate inputs with a single GPT-4 call
+        Returns one ParsedIntent per input, in the same order; None for inputs the
+        batch call could not parse, which the caller passes to understand_input
+        """
+        # Cached inputs need no call; a lone uncached input goes through the normal path
+        pending = [text for text in dict.fromkeys(user_inputs) if self._intent_key(text) not in self._intent_cache]
+        if len(pending) <= 1:
+            return [await self.understand_input(text) for text in user_inputs]
+        
+        await self.setup_session()
+        
+        system_prompt = self._build_understanding_prompt() + """
+
+The user sent several separate requests at once, given as a JSON array.
+Return {"intents": [...]} with one object per request, in the same order, each in the format above."""
+        
+        parsed_by_input = {}
+        try:
+            async with self.session.post(
+                "https://api.openai.com/v1/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {self.openai_api_key}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "model": "gpt-4-turbo-preview",
+                    "messages": [
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": json.dumps(pending)}
+                    ],
+                    "temperature": 0.3,
+                    "max_tokens": 500 * len(pending),
+                    "response_format": {"type": "json_object"}
+                }
+            ) as response:
+                if response.status == 200:
+                    result = await response.json()
+                    understandings = json.loads(result["choices"][0]["message"]["content"])["intents"]
+                    if len(understandings) != len(pending):
+                        raise ValueError(f"expected {len(pending)} intents, got {len(understandings)}")
+                    
+                    for text, understanding in zip(pending, understandings):
+                        parsed = self._to_parsed_intent(understanding)
+                        self._cache_intent(text, parsed)
+                        parsed_by_input[text] = parsed
+                else:
+                    print(f"Batch understanding failed with status {response.status}")
+                        
+        except Exception as e:
+            print(f"Batch understanding error: {e}")
+        
+        intents = []
+        for text in user_inputs:
+            # A private copy per position, even for inputs repeated within the batch
+            parsed = parsed_by_input.get(text)
+            parsed = copy.deepcopy(parsed) if parsed is not None else self._cached_intent(text)
+            if parsed is not None:
+                # Unparsed inputs are added to the history by understand_input instead
+                self.conversation_history.append({
+                    "role": "user",
+                    "content": text
+                })
+            intents.append(parsed)
+        return intents
+    
+    def _to_parsed_intent(self, understanding: Dict[str, Any]) -> ParsedIntent:
+        """Convert the model's JSON understanding into a ParsedIntent"""
+        return ParsedIntent(
+            intent_type=IntentType(understanding.get("intent_type", "general_question")),
+            confidence=understanding.get("confidence", 0.5),
+            primary_action=understanding.get("primary_action", ""),
+            entities=understanding.get("entities", {}),
+            context=understanding.get("context", {}),
+            requires_clarification=understanding.get("requires_clarification", False),
+            clarification_questions=understanding.get("clarification_questions", [])
+        )
+    
+    def _intent_key(self, user_input: str) -> Tuple[str, str]:
+        """Cache key: the input plus a fingerprint of the context memory the prompt embeds"""
+        context = json.dumps(self.context_memory, sort_keys=True, default=str)
+        return hashlib.blake2b(context.encode(), digest_size=16).hexdigest(), user_input
+    
+    def _cached_intent(self, user_input: str) -> Optional[ParsedIntent]:
+        """Private copy of a cached intent for this input and context, or None"""
+        key = self._intent_key(user_input)
+        cached = self._intent_cache.get(key)
+        if cached is None:
+            return None
+        self._intent_cache.move_to_end(key)
+        # Callers mutate entities/context, so never hand out the cached instance
+        return copy.deepcopy(cached)
+    
+    def _cache_intent(self, user_input: str, parsed: ParsedIntent):
+        """Remember a parsed intent, evicting the least recently used past the cap"""
+        # "make it faster" / "same for the enemy" depend on earlier messages, which the key doesn't cover
+        context = parsed.context or {}
+        if context.get("reference_previous") or context.get("modifying_existing"):
+            return
+        
+        self._intent_cache[self._intent_key(user_input)] = copy.deepcopy(parsed)
+        if len(self._intent_cache) > self.intent_cache_size:
+            self._intent_cache.popitem(last=False)
+    
     def _build_understanding_prompt(self) -> str:
         """Build system prompt for natural language understanding"""
         return f"""You are an advanced AI assistant for Unreal Engine development. Parse user input and respond in JSON format.
@@ -43,6 +43,8 @@ class CompleteUltimateApp(ctk.CTk):
         self.ai_brain = AdvancedAIBrain(OPENAI_API_KEY, CPP_AI_API_URL)
         self.save_manager = SaveExportManager("exports")
         self.learning_ai = SelfImprovingAI(OPENAI_API_KEY, "ai_learning.db")
+        # Per-click event loops are short-lived; maintenance runs from the reflection loop instead
+        self.learning_ai.maintenance_enabled = False
         self.visual_editor = None
         
         # State
@@ -700,6 +702,11 @@ LEARNING:
         while True:
             time.sleep(3600)  # Every hour
             
+            try:
+                self.learning_ai.run_maintenance()
+            except Exception as e:
+                print(f"Database maintenance error: {e}")
+            
             try:
                 reflection = loop.run_until_complete(
                     self.learning_ai.reflect_and_improve()
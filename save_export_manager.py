@@ -4,18 +4,72 @@ Supports multiple formats, version control, and team collaboration
 """
 
 import os
+import errno
 import json
 import zipfile
 import shutil
 import time
 import hashlib
+import functools
 from datetime import datetime
-from typing import Dict, Any, List, Optional
-from dataclasses import dataclass, asdict
+from typing import Dict, Any, List, Optional, Tuple
+from dataclasses import dataclass
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
 import aiohttp
 import asyncio
 
+# Shared pool for independent file copies
+_IO_POOL = ThreadPoolExecutor(max_workers=16)
+
+def _fast_copy(src: str, dst) -> None:
+    """Copy file contents and permission bits, staying in kernel space where supported"""
+    # Never write through a hard link shared with a previous save
+    try:
+        os.unlink(dst)
+    except FileNotFoundError:
+        pass
+    
+    if not hasattr(os, "copy_file_range"):
+        shutil.copy(src, dst)
+        return
+    
+    fallback = False
+    src_fd = os.open(src, os.O_RDONLY)
+    try:
+        src_stat = os.fstat(src_fd)
+        dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, src_stat.st_mode & 0o777)
+        try:
+            remaining = src_stat.st_size
+            while remaining > 0:
+                copied = os.copy_file_range(src_fd, dst_fd, remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                raise
+            fallback = True
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+    
+    if fallback:
+        shutil.copyfile(src, dst)
+
+@functools.lru_cache(maxsize=512)
+def _load_metadata_cached(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Parse a metadata.json; the mtime/size key invalidates entries when the file changes"""
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def _dump_json(path, data) -> None:
+    """Write data as indented JSON (for use with asyncio.to_thread)"""
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
 @dataclass
 class ProjectMetadata:
     """Metadata for saved projects"""
@@ -30,7 +84,10 @@ class ProjectMetadata:
     tags: List[str] = None
     
     def to_dict(self):
-        return asdict(self)
+        # Flat fields only, so a shallow copy is enough (asdict deep-copies)
+        data = self.__dict__.copy()
+        data['tags'] = list(self.tags) if self.tags else []
+        return data
 
 @dataclass
 class AssetExport:
@@ -52,16 +109,33 @@ class SaveExportManager:
         self.base_path.mkdir(exist_ok=True)
         
         # Create subdirectories
-        (self.base_path / "projects").mkdir(exist_ok=True)
-        (self.base_path / "assets").mkdir(exist_ok=True)
+        self._projects_root = self.base_path / "projects"
+        self._assets_root = self.base_path / "assets"
+        self._team_root = self.base_path / "team_shared"
+        self._backups_root = self.base_path / "backups"
+        
+        self._projects_root.mkdir(exist_ok=True)
+        self._assets_root.mkdir(exist_ok=True)
         (self.base_path / "code").mkdir(exist_ok=True)
-        (self.base_path / "team_shared").mkdir(exist_ok=True)
-        (self.base_path / "backups").mkdir(exist_ok=True)
+        self._team_root.mkdir(exist_ok=True)
+        self._backups_root.mkdir(exist_ok=True)
+        
+        # Joined project directory paths, by project id
+        self._project_dirs: Dict[str, Path] = {}
         
         self.current_project = None
         self.auto_save_enabled = True
         self.auto_save_interval = 300  # 5 minutes
         
+        # Content hashes of files written by previous saves, per project
+        self._hash_cache: Dict[str, Dict[str, Dict[str, str]]] = {}
+        # Most recent save directory per project
+        self._latest_save_cache: Dict[str, Path] = {}
+        
+        # Existing backups, oldest first (scanned once, then maintained on create)
+        self.max_backups = 10
+        self._backup_queue = deque(sorted(self._backups_root.glob("backup_*"), key=lambda x: x.name))
+        
     # ===== PROJECT MANAGEMENT =====
     
     def create_project(
@@ -89,7 +163,7 @@ class SaveExportManager:
         )
         
         # Create project directory
-        project_dir = self.base_path / "projects" / project_id
+        project_dir = self._project_dir(project_id)
         project_dir.mkdir(exist_ok=True)
         
         # Save metadata
@@ -109,40 +183,62 @@ class SaveExportManager:
         if not self.current_project:
             raise ValueError("No active project")
         
-        project_dir = self.base_path / "projects" / self.current_project.project_id
+        project_dir = self._project_dir(self.current_project.project_id)
         
-        # Create timestamped save
-        timestamp = int(time.time())
+        # Create timestamped save (one clock read shared by every field of this save)
+        now = datetime.now()
+        now_iso = now.isoformat()
+        timestamp = int(now.timestamp())
         save_dir = project_dir / f"save_{timestamp}"
-        save_dir.mkdir(exist_ok=True)
         
-        # Save assets
-        assets_data = []
-        for asset in assets:
-            asset_export = self._export_asset(asset, save_dir)
-            assets_data.append(asset_export.to_dict() if hasattr(asset_export, 'to_dict') else asset_export)
+        # Never reuse a directory: files in it may be hard links into earlier saves.
+        # Suffixed names still sort after the plain one, so _scan_latest picks the newest
+        suffix = 0
+        while True:
+            try:
+                save_dir.mkdir()
+                break
+            except FileExistsError:
+                suffix += 1
+                save_dir = project_dir / f"save_{timestamp}_{suffix:04d}"
+        
+        hash_cache = self._get_hash_cache(project_dir)
         
-        # Save code files
+        # Save code files in parallel (unchanged files are hard-linked from the previous save)
         code_dir = save_dir / "code"
         code_dir.mkdir(exist_ok=True)
-        for code_file in code_files:
-            if os.path.exists(code_file):
-                shutil.copy(code_file, code_dir / os.path.basename(code_file))
-        
-        # Save project state
-        project_state = {
-            "metadata": self.current_project.to_dict(),
-            "assets": assets_data,
-            "code_files": [os.path.basename(f) for f in code_files],
-            "saved_at": datetime.now().isoformat()
+        targets = {
+            os.path.basename(code_file): code_file
+            for code_file in code_files if os.path.exists(code_file)
         }
-        
+        for key, entry in _IO_POOL.map(
+            lambda item: self._save_code_file(item[1], code_dir / item[0], hash_cache),
+            targets.items()
+        ):
+            hash_cache[key] = entry
+        
+        # Save project state, streaming assets one at a time so large projects
+        # never hold the whole document in memory
         with open(save_dir / "project_state.json", 'w') as f:
-            json.dump(project_state, f, indent=2)
+            f.write('{"metadata": ')
+            f.write(json.dumps(self.current_project.to_dict()))
+            f.write(', "assets": [')
+            for i, asset in enumerate(assets):
+                asset_export = self._export_asset(asset, save_dir, hash_cache)
+                asset_data = asset_export.to_dict() if hasattr(asset_export, 'to_dict') else asset_export
+                f.write(',\n' if i else '\n')
+                f.write(json.dumps(asset_data))
+            f.write('\n], "code_files": ')
+            f.write(json.dumps([os.path.basename(code_file) for code_file in code_files]))
+            f.write(', "saved_at": ')
+            f.write(json.dumps(now_iso))
+            f.write('}\n')
         
         # Update project metadata
-        self.current_project.updated_at = datetime.now().isoformat()
+        self.current_project.updated_at = now_iso
         self._save_metadata(project_dir, self.current_project)
+        self._save_hash_cache(project_dir, hash_cache)
+        self._latest_save_cache[self.current_project.project_id] = save_dir
         
         # Create backup if requested
         if auto_backup:
@@ -152,8 +248,12 @@ class SaveExportManager:
     
     def load_project(self, project_id: str) -> Dict[str, Any]:
         """Load a project"""
+        return self._load_project_with_path(project_id)[0]
+    
+    def _load_project_with_path(self, project_id: str) -> Tuple[Dict[str, Any], Optional[Path]]:
+        """Load a project, also returning its latest save directory (None if never saved)"""
         
-        project_dir = self.base_path / "projects" / project_id
+        project_dir = self._project_dir(project_id)
         
         if not project_dir.exists():
             raise FileNotFoundError(f"Project {project_id} not found")
@@ -163,17 +263,15 @@ class SaveExportManager:
         self.current_project = metadata
         
         # Find latest save
-        saves = sorted(project_dir.glob("save_*"), key=lambda x: x.name, reverse=True)
-        
-        if not saves:
-            return {"metadata": metadata.to_dict(), "assets": [], "code_files": []}
+        latest_save = self._get_latest_save(project_dir)
         
-        latest_save = saves[0]
+        if latest_save is None:
+            return {"metadata": metadata.to_dict(), "assets": [], "code_files": []}, None
         
         with open(latest_save / "project_state.json", 'r') as f:
             project_state = json.load(f)
         
-        return project_state
+        return project_state, latest_save
     
     # ===== EXPORT FORMATS =====
     
@@ -221,20 +319,8 @@ class SaveExportManager:
             ]
         }
         
-        with open(plugin_dir / f"{plugin_name}.uplugin", 'w') as f:
-            json.dump(uplugin, f, indent=2)
-        
-        # Copy code files
-        for code_file in code_files:
-            if os.path.exists(code_file):
-                filename = os.path.basename(code_file)
-                target_dir = plugin_dir / "Source" / plugin_name / ("Public" if filename.endswith('.h') else "Private")
-                shutil.copy(code_file, target_dir / filename)
-        
         # Generate Build.cs
         build_cs = self._generate_build_cs(plugin_name)
-        with open(plugin_dir / "Source" / plugin_name / f"{plugin_name}.Build.cs", 'w') as f:
-            f.write(build_cs)
         
         # Copy assets
         for asset in assets:
@@ -261,12 +347,40 @@ AI Generated Unreal Engine Plugin
 Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 """
         
-        with open(plugin_dir / "README.md", 'w') as f:
-            f.write(readme)
-        
-        # Create zip archive
+        # Write the plugin folder and its zip archive in the same pass
         zip_path = f"{output_path}/{plugin_name}.zip"
-        shutil.make_archive(zip_path.replace('.zip', ''), 'zip', plugin_dir)
+        source_arc = f"Source/{plugin_name}"
+        
+        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+            # Keep the empty content folders in the archive
+            zf.writestr("Content/", "")
+            zf.writestr("Resources/", "")
+            
+            generated_files = [
+                (f"{plugin_name}.uplugin", json.dumps(uplugin, indent=2)),
+                (f"{source_arc}/{plugin_name}.Build.cs", build_cs),
+                ("README.md", readme)
+            ]
+            for arcname, content in generated_files:
+                with open(plugin_dir / arcname, 'w') as f:
+                    f.write(content)
+                zf.writestr(arcname, content)
+            
+            # Copy code files on the I/O pool while adding them to the archive
+            targets = {}
+            for code_file in code_files:
+                if os.path.exists(code_file):
+                    filename = os.path.basename(code_file)
+                    targets[f"{source_arc}/{'Public' if filename.endswith('.h') else 'Private'}/{filename}"] = code_file
+            
+            copies = [
+                _IO_POOL.submit(_fast_copy, code_file, plugin_dir / arcname)
+                for arcname, code_file in targets.items()
+            ]
+            for arcname, code_file in targets.items():
+                zf.write(code_file, arcname)
+            for copy in copies:
+                copy.result()
         
         return zip_path
     
@@ -285,8 +399,8 @@ Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         if not self.current_project:
             raise ValueError("No active project")
         
-        # Load latest project state
-        project_state = self.load_project(self.current_project.project_id)
+        # Load latest project state, along with the save it came from
+        project_state, latest_save = self._load_project_with_path(self.current_project.project_id)
         
         # Create package structure
         (package_dir / "Source").mkdir(exist_ok=True)
@@ -294,15 +408,13 @@ Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         (package_dir / "Documentation").mkdir(exist_ok=True)
         
         # Copy all files
-        project_dir = self.base_path / "projects" / self.current_project.project_id
-        latest_save = sorted(project_dir.glob("save_*"), key=lambda x: x.name, reverse=True)[0]
-        
-        if include_source:
+        if include_source and latest_save is not None:
             shutil.copytree(latest_save / "code", package_dir / "Source", dirs_exist_ok=True)
         
         # Generate documentation
+        exported_at = datetime.now()
         if include_documentation:
-            self._generate_documentation(package_dir / "Documentation", project_state)
+            self._generate_documentation(package_dir / "Documentation", project_state, exported_at)
         
         # Create package info
         package_info = {
@@ -310,7 +422,7 @@ Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             "version": self.current_project.version,
             "author": self.current_project.author,
             "created": self.current_project.created_at,
-            "exported": datetime.now().isoformat(),
+            "exported": exported_at.isoformat(),
             "assets": len(project_state.get("assets", [])),
             "code_files": len(project_state.get("code_files", []))
         }
@@ -338,22 +450,18 @@ Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         
         # Initialize git if not exists
         if not (repo_dir / ".git").exists():
-            subprocess.run(["git", "init"], cwd=repo_dir)
-            subprocess.run(["git", "config", "user.name", "AI Architect"], cwd=repo_dir)
-            subprocess.run(["git", "config", "user.email", "ai@architect.dev"], cwd=repo_dir)
+            subprocess.run(["git", "init"], cwd=repo_dir, check=True)
         
         # Copy project files
         if self.current_project:
-            project_state = self.load_project(self.current_project.project_id)
+            # Only the latest save's code is needed, so skip re-reading the project state
+            latest_save = self._get_latest_save(self._project_dir(self.current_project.project_id))
             
             # Copy code
             code_dir = repo_dir / "Source"
             code_dir.mkdir(exist_ok=True)
             
-            project_dir = self.base_path / "projects" / self.current_project.project_id
-            latest_save = sorted(project_dir.glob("save_*"), key=lambda x: x.name, reverse=True)[0]
-            
-            if (latest_save / "code").exists():
+            if latest_save is not None and (latest_save / "code").exists():
                 shutil.copytree(latest_save / "code", code_dir, dirs_exist_ok=True)
         
         # Create .gitignore
@@ -381,7 +489,11 @@ DerivedDataCache/
         
         # Git commit
         subprocess.run(["git", "add", "."], cwd=repo_dir)
-        subprocess.run(["git", "commit", "-m", commit_message], cwd=repo_dir)
+        # Identity passed per commit instead of spawning `git config` twice
+        subprocess.run([
+            "git", "-c", "user.name=AI Architect", "-c", "user.email=ai@architect.dev",
+            "commit", "-m", commit_message
+        ], cwd=repo_dir)
         
         return str(repo_dir)
     
@@ -404,12 +516,12 @@ DerivedDataCache/
             }
         
         # Copy to team shared directory
-        project_dir = self.base_path / "projects" / project_id
-        team_dir = self.base_path / "team_shared" / team_id
+        project_dir = self._project_dir(project_id)
+        team_dir = self._team_root / team_id
         team_dir.mkdir(parents=True, exist_ok=True)
         
         shared_project_dir = team_dir / project_id
-        shutil.copytree(project_dir, shared_project_dir, dirs_exist_ok=True)
+        await asyncio.to_thread(shutil.copytree, project_dir, shared_project_dir, dirs_exist_ok=True)
         
         # Create team permissions file
         team_permissions = {
@@ -420,8 +532,7 @@ DerivedDataCache/
             "permissions": permissions
         }
         
-        with open(shared_project_dir / "team_permissions.json", 'w') as f:
-            json.dump(team_permissions, f, indent=2)
+        await asyncio.to_thread(_dump_json, shared_project_dir / "team_permissions.json", team_permissions)
         
         return team_permissions
     
@@ -432,26 +543,29 @@ DerivedDataCache/
     ) -> Dict[str, Any]:
         """Sync project with team version"""
         
-        team_dir = self.base_path / "team_shared" / team_id / project_id
-        local_dir = self.base_path / "projects" / project_id
+        team_dir = self._team_root / team_id / project_id
+        local_dir = self._project_dir(project_id)
         
         if not team_dir.exists():
             return {"error": "Team project not found"}
         
-        # Compare versions
-        team_metadata = self._load_metadata(team_dir)
-        local_metadata = self._load_metadata(local_dir)
+        # Compare versions (disk work stays off the event loop)
+        team_metadata, local_metadata = await asyncio.gather(
+            asyncio.to_thread(self._load_metadata, team_dir),
+            asyncio.to_thread(self._load_metadata, local_dir)
+        )
         
         team_updated = datetime.fromisoformat(team_metadata.updated_at)
         local_updated = datetime.fromisoformat(local_metadata.updated_at)
         
         if team_updated > local_updated:
             # Pull from team
-            shutil.copytree(team_dir, local_dir, dirs_exist_ok=True)
+            await asyncio.to_thread(shutil.copytree, team_dir, local_dir, dirs_exist_ok=True)
+            self._latest_save_cache.pop(project_id, None)
             return {"action": "pulled", "from": "team", "updated": team_metadata.updated_at}
         elif local_updated > team_updated:
             # Push to team
-            shutil.copytree(local_dir, team_dir, dirs_exist_ok=True)
+            await asyncio.to_thread(shutil.copytree, local_dir, team_dir, dirs_exist_ok=True)
             return {"action": "pushed", "to": "team", "updated": local_metadata.updated_at}
         else:
             return {"action": "none", "message": "Already in sync"}
@@ -459,50 +573,63 @@ DerivedDataCache/
     def get_team_projects(self, team_id: str) -> List[Dict[str, Any]]:
         """Get all projects shared with team"""
         
-        team_dir = self.base_path / "team_shared" / team_id
+        team_dir = self._team_root / team_id
         
         if not team_dir.exists():
             return []
         
-        projects = []
-        for project_dir in team_dir.iterdir():
-            if project_dir.is_dir():
-                metadata = self._load_metadata(project_dir)
-                
-                # Load permissions
-                permissions_file = project_dir / "team_permissions.json"
-                permissions = {}
-                if permissions_file.exists():
-                    with open(permissions_file, 'r') as f:
-                        perms_data = json.load(f)
-                        permissions = perms_data.get("permissions", {})
-                
-                projects.append({
-                    "metadata": metadata.to_dict(),
-                    "permissions": permissions
-                })
-        
-        return projects
+        # scandir entries carry the d_type, so is_dir() needs no extra stat
+        with os.scandir(team_dir) as entries:
+            project_dirs = [Path(entry.path) for entry in entries if entry.is_dir(follow_symlinks=False)]
+        
+        # Each project is a couple of small independent reads - fan them out
+        return list(_IO_POOL.map(self._load_team_project_entry, project_dirs))
+    
+    def _load_team_project_entry(self, project_dir: Path) -> Dict[str, Any]:
+        """Load metadata and permissions of one team project"""
+        metadata = self._load_metadata(project_dir)
+        
+        # Load permissions
+        permissions = {}
+        try:
+            with open(project_dir / "team_permissions.json", 'r') as f:
+                permissions = json.load(f).get("permissions", {})
+        except FileNotFoundError:
+            pass
+        
+        return {
+            "metadata": metadata.to_dict(),
+            "permissions": permissions
+        }
     
     # ===== AUTO-SAVE =====
     
     async def start_auto_save(self, callback):
         """Start auto-save loop"""
         
+        # Schedule against the monotonic loop clock so slow saves don't push later ticks back
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time() + self.auto_save_interval
+        
         while self.auto_save_enabled:
-            await asyncio.sleep(self.auto_save_interval)
+            await asyncio.sleep(max(0, next_tick - loop.time()))
+            next_tick += self.auto_save_interval
+            # Skip ticks missed while a save overran the interval instead of bursting
+            while next_tick <= loop.time():
+                next_tick += self.auto_save_interval
             
             if self.current_project:
                 try:
                     # Get current state from callback
                     state = callback()
                     if state:
-                        self.save_project(
+                        await asyncio.to_thread(
+                            self.save_project,
                             assets=state.get("assets", []),
                             code_files=state.get("code_files", []),
                             auto_backup=False
                         )
-                        print(f"[AUTO-SAVE] Project saved at {datetime.now().strftime('%H:%M:%S')}")
+                        print(f"[AUTO-SAVE] Project saved at {time.strftime('%H:%M:%S')}")
                 except Exception as e:
                     print(f"[AUTO-SAVE] Error: {e}")
     
@@ -510,8 +637,8 @@ DerivedDataCache/
     
     def _generate_id(self, name: str) -> str:
         """Generate unique ID"""
-        timestamp = str(int(time.time()))
-        return hashlib.md5(f"{name}{timestamp}".encode()).hexdigest()[:12]
+        # Nanosecond timestamp so same-named projects created within a second differ
+        return hashlib.blake2b(f"{name}{time.time_ns()}".encode(), digest_size=6).hexdigest()
     
     def _save_metadata(self, directory: Path, metadata: ProjectMetadata):
         """Save metadata to directory"""
@@ -520,19 +647,42 @@ DerivedDataCache/
     
     def _load_metadata(self, directory: Path) -> ProjectMetadata:
         """Load metadata from directory"""
-        with open(directory / "metadata.json", 'r') as f:
-            data = json.load(f)
-            return ProjectMetadata(**data)
+        path = str(directory / "metadata.json")
+        st = os.stat(path)
+        data = _load_metadata_cached(path, st.st_mtime_ns, st.st_size)
+        
+        # Fresh instance per call - callers mutate the returned metadata
+        metadata = ProjectMetadata(**data)
+        metadata.tags = list(metadata.tags) if metadata.tags else []
+        return metadata
     
-    def _export_asset(self, asset: Dict[str, Any], save_dir: Path) -> Dict[str, Any]:
+    def _export_asset(
+        self,
+        asset: Dict[str, Any],
+        save_dir: Path,
+        hash_cache: Optional[Dict[str, Dict[str, str]]] = None
+    ) -> Dict[str, Any]:
         """Export single asset"""
         
         asset_dir = save_dir / "assets" / asset.get("name", "asset")
         asset_dir.mkdir(parents=True, exist_ok=True)
         
-        # Save asset data
-        with open(asset_dir / "asset.json", 'w') as f:
-            json.dump(asset, f, indent=2)
+        # Save asset data, reusing the previous save's file if unchanged
+        payload = json.dumps(asset, indent=2)
+        target = asset_dir / "asset.json"
+        key = f"asset:{asset.get('name', 'asset')}"
+        digest = hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+        
+        if hash_cache is None or not self._reuse_unchanged(hash_cache, key, digest, target):
+            # Never write through a hard link shared with a previous save
+            try:
+                os.unlink(target)
+            except FileNotFoundError:
+                pass
+            with open(target, 'w') as f:
+                f.write(payload)
+        if hash_cache is not None:
+            hash_cache[key] = {"hash": digest, "path": os.path.abspath(target)}
         
         return {
             "asset_id": asset.get("name", "unknown"),
@@ -542,19 +692,105 @@ DerivedDataCache/
             "metadata": asset
         }
     
+    def _project_dir(self, project_id: str) -> Path:
+        """Get the directory of a project, reusing the joined path"""
+        project_dir = self._project_dirs.get(project_id)
+        if project_dir is None:
+            project_dir = self._project_dirs[project_id] = self._projects_root / project_id
+        return project_dir
+    
+    def _get_latest_save(self, project_dir: Path) -> Optional[Path]:
+        """Get the most recent save directory of a project"""
+        latest_save = self._latest_save_cache.get(project_dir.name)
+        if latest_save is not None and latest_save.exists():
+            return latest_save
+        
+        latest_save = self._scan_latest(project_dir)
+        if latest_save is not None:
+            self._latest_save_cache[project_dir.name] = latest_save
+        return latest_save
+    
+    def _scan_latest(self, project_dir: Path) -> Optional[Path]:
+        """Find the most recent save directory in a single pass"""
+        latest_name = None
+        with os.scandir(project_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith("save_") and (latest_name is None or entry.name > latest_name):
+                    latest_name = entry.name
+        return project_dir / latest_name if latest_name else None
+    
+    def _save_code_file(
+        self,
+        code_file: str,
+        target: Path,
+        hash_cache: Dict[str, Dict[str, str]]
+    ) -> Tuple[str, Dict[str, str]]:
+        """Save one code file, returning its hash cache key and entry"""
+        key = os.path.abspath(code_file)
+        digest = self._file_digest(code_file)
+        if not self._reuse_unchanged(hash_cache, key, digest, target):
+            _fast_copy(code_file, target)
+        return key, {"hash": digest, "path": os.path.abspath(target)}
+    
+    def _file_digest(self, path: str) -> str:
+        """Hash file contents for change detection"""
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    def _reuse_unchanged(
+        self,
+        hash_cache: Dict[str, Dict[str, str]],
+        key: str,
+        digest: str,
+        target: Path
+    ) -> bool:
+        """Hard-link the previously saved copy into target if content is unchanged"""
+        entry = hash_cache.get(key)
+        if not entry or entry.get("hash") != digest:
+            return False
+        
+        try:
+            os.link(entry["path"], target)
+        except OSError:
+            # Previous copy gone or links unsupported - caller writes normally
+            return False
+        return True
+    
+    def _get_hash_cache(self, project_dir: Path) -> Dict[str, Dict[str, str]]:
+        """Get the content hash cache for a project, loading it from disk once"""
+        project_id = project_dir.name
+        if project_id not in self._hash_cache:
+            cache_file = project_dir / "_hash_cache.json"
+            cache = {}
+            if cache_file.exists():
+                try:
+                    with open(cache_file, 'r') as f:
+                        cache = json.load(f)
+                except (OSError, ValueError):
+                    cache = {}
+            self._hash_cache[project_id] = cache
+        return self._hash_cache[project_id]
+    
+    def _save_hash_cache(self, project_dir: Path, hash_cache: Dict[str, Dict[str, str]]):
+        """Persist the content hash cache next to the project metadata"""
+        with open(project_dir / "_hash_cache.json", 'w') as f:
+            json.dump(hash_cache, f)
+    
     def _create_backup(self, source_dir: Path):
         """Create backup of save"""
         
         backup_name = f"backup_{int(time.time())}"
-        backup_dir = self.base_path / "backups" / backup_name
+        backup_dir = self._backups_root / backup_name
         
         shutil.copytree(source_dir, backup_dir)
+        self._backup_queue.append(backup_dir)
         
-        # Keep only last 10 backups
-        backups = sorted(self.base_path.glob("backups/backup_*"), key=lambda x: x.name)
-        if len(backups) > 10:
-            for old_backup in backups[:-10]:
-                shutil.rmtree(old_backup)
+        # Keep only the most recent backups
+        while len(self._backup_queue) > self.max_backups:
+            shutil.rmtree(self._backup_queue.popleft(), ignore_errors=True)
     
     def _generate_build_cs(self, module_name: str) -> str:
         """Generate Unreal Build.cs file"""
@@ -580,9 +816,17 @@ public class {module_name} : ModuleRules
 }}
 '''
     
-    def _generate_documentation(self, doc_dir: Path, project_state: Dict[str, Any]):
+    def _generate_documentation(
+        self,
+        doc_dir: Path,
+        project_state: Dict[str, Any],
+        exported_at: Optional[datetime] = None
+    ):
         """Generate project documentation"""
         
+        if exported_at is None:
+            exported_at = datetime.now()
+        
         # Generate README
         readme = f"""# {project_state['metadata']['name']}
 
@@ -601,7 +845,7 @@ Total Assets: {len(project_state.get('assets', []))}
 Total Files: {len(project_state.get('code_files', []))}
 
 ## Export Information
-- **Exported**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+- **Exported**: {exported_at.strftime('%Y-%m-%d %H:%M:%S')}
 - **Generated by**: AI Architect Ultimate Edition
 
 ## Usage
@@ -9,13 +9,73 @@ Self-Improving AI System
 import asyncio
 import aiohttp
 import json
+import re
 import time
 import sqlite3
+import threading
+import atexit
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 from pathlib import Path
+from collections import OrderedDict, Counter
 import hashlib
+import itertools
+
+# Compact one-shot encoder (C fast path) for prompts and stored solutions
+_compact_json = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+# Stored timestamps are integer epoch microseconds
+_US_PER_DAY = 86400 * 1000000
+
+# Timestamp column of each table that stores one
+_TIMESTAMP_COLUMNS = {
+    "performance_metrics": "timestamp",
+    "learning_entries": "timestamp",
+    "error_patterns": "last_seen",
+    "optimization_insights": "created_at",
+}
+
+def _now_us() -> int:
+    """Current time as integer epoch microseconds"""
+    return time.time_ns() // 1000
+
+# Database maintenance steps and how often each is due (microseconds)
+_MAINTENANCE_PERIODS = {
+    "optimize": 3600 * 1000000,  # metric retention + PRAGMA optimize
+    "analyze": _US_PER_DAY,      # ANALYZE + full-text index merge
+    "vacuum": 7 * _US_PER_DAY
+}
+
+# Hot-path statements, kept as constants so the connection's statement cache
+# always sees the identical SQL text and reuses the prepared statement
+_SQL_INSERT_METRIC = "INSERT INTO performance_metrics VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+_SQL_UPSERT_OP_STATS = """
+    INSERT INTO op_stats (operation_type, total, successes, sum_duration, sum_quality)
+    VALUES (?, 1, ?, ?, ?)
+    ON CONFLICT(operation_type) DO UPDATE SET
+        total = total + 1,
+        successes = successes + excluded.successes,
+        sum_duration = sum_duration + excluded.sum_duration,
+        sum_quality = sum_quality + excluded.sum_quality
+"""
+_SQL_SELECT_OP_STATS = "SELECT total, successes, sum_duration, sum_quality FROM op_stats WHERE operation_type = ?"
+_SQL_INSERT_LEARNING = "INSERT OR REPLACE INTO learning_entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+_SQL_INSERT_INSIGHT = "INSERT OR IGNORE INTO optimization_insights VALUES (?, ?, ?, ?, ?, ?, ?)"
+# Reflection inputs in one statement: rows tagged 'perf' (per operation type)
+# or 'learn' (per learning category)
+_SQL_REFLECTION_AGGREGATES = """
+    SELECT 'perf', operation_type, AVG(duration), AVG(quality_score), AVG(success)
+    FROM performance_metrics
+    WHERE timestamp > ?
+    GROUP BY operation_type
+    UNION ALL
+    SELECT 'learn', category, AVG(effectiveness_score), COUNT(*), NULL
+    FROM learning_entries
+    WHERE times_used > 0
+    GROUP BY category
+"""
 
 @dataclass
 class PerformanceMetrics:
@@ -39,7 +99,7 @@ class PerformanceMetrics:
 class LearningEntry:
     """Entry in the learning database"""
     entry_id: str
-    timestamp: str
+    timestamp: int  # epoch microseconds
     category: str  # error_solution, optimization, pattern
     problem: str
     solution: str
@@ -65,9 +125,42 @@ class SelfImprovingAI:
         self._init_databases()
         
         # Performance tracking
-        self.performance_history = []
+        self._in_flight: Dict[str, Tuple[str, float]] = {}  # operation_id -> (type, start time)
         self.success_rate_cache = {}
         
+        # Running [total, successes, sum_duration, sum_quality] per operation type,
+        # re-read from op_stats after every op_stats_resync_every operations
+        self._op_totals: Dict[str, List[float]] = {}
+        self._pending_updates: Counter = Counter()
+        self.op_stats_resync_every = 32
+        
+        # Metric rows waiting to be written in one batch; telemetry only, so rows
+        # are held in memory for up to metrics_flush_every rows, or until the oldest one
+        # is metrics_flush_interval seconds old (a timer flushes it if nothing else does)
+        self._metrics_buffer: List[tuple] = []
+        self.metrics_flush_every = 64
+        self.metrics_flush_interval = 60.0
+        self._metrics_buffered_since: Optional[float] = None
+        self._metrics_flush_timer: Optional[threading.Timer] = None
+        atexit.register(self.flush_metrics)
+        
+        # Recently resolved errors: key -> (expires_at, value), oldest first
+        self._solution_cache: OrderedDict = OrderedDict()
+        self._synthesis_cache: OrderedDict = OrderedDict()
+        self.solution_cache_size = 512
+        self.solution_cache_ttl = 3600
+        self.failure_cache_ttl = 60
+        self._cache_lock = threading.Lock()
+        
+        # Disambiguates ids generated within the same clock tick
+        self._id_counter = itertools.count()
+        
+        # Background retention/compaction, started with the session
+        self.maintenance_enabled = True
+        self.maintenance_interval = 3600.0
+        self.metrics_retention_days = 30
+        self._maintenance_task: Optional[asyncio.Task] = None
+        
         # Web search APIs
         self.search_engines = {
             "google": "https://www.googleapis.com/customsearch/v1",
@@ -78,8 +171,31 @@ class SelfImprovingAI:
     def _init_databases(self):
         """Initialize SQLite databases for learning"""
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        # One long-lived connection shared by the GUI and worker threads
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=512)
+        self._db_lock = threading.RLock()
+        # Reused for the per-operation metric writes and aggregate reads
+        self._hot_cursor = self._conn.cursor()
+        
+        cursor = self._conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.execute("PRAGMA cache_size=-64000")
+        # Make INSERT OR REPLACE fire delete triggers so full-text indexes stay in sync
+        cursor.execute("PRAGMA recursive_triggers=ON")
+        
+        # Schema setup and migration commit together; without an explicit transaction
+        # every DROP/ALTER/CREATE would commit on its own
+        cursor.execute("BEGIN")
+        
+        # Databases written before timestamps became epoch integers store ISO text;
+        # move those tables aside and copy their rows over once the new ones exist
+        migrated = {
+            table for table, column in _TIMESTAMP_COLUMNS.items()
+            if self._move_aside_text_timestamps(cursor, table, column)
+        }
         
         # Performance metrics table
         cursor.execute('''
@@ -95,15 +211,38 @@ class SelfImprovingAI:
                 tokens_used INTEGER,
                 quality_score REAL,
                 user_feedback TEXT,
-                timestamp TEXT
+                timestamp INTEGER
             )
         ''')
+        if "performance_metrics" in migrated:
+            self._copy_text_timestamps(cursor, "performance_metrics", _TIMESTAMP_COLUMNS["performance_metrics"])
+        
+        # Running per-operation-type aggregates of performance_metrics
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'op_stats'")
+        op_stats_exists = cursor.fetchone() is not None
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS op_stats (
+                operation_type TEXT PRIMARY KEY,
+                total INTEGER,
+                successes INTEGER,
+                sum_duration REAL,
+                sum_quality REAL
+            )
+        ''')
+        if not op_stats_exists:
+            cursor.execute('''
+                INSERT INTO op_stats
+                SELECT operation_type, COUNT(*), COALESCE(SUM(success), 0),
+                       COALESCE(SUM(duration), 0), COALESCE(SUM(quality_score), 0)
+                FROM performance_metrics
+                GROUP BY operation_type
+            ''')
         
         # Learning entries table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS learning_entries (
                 entry_id TEXT PRIMARY KEY,
-                timestamp TEXT,
+                timestamp INTEGER,
                 category TEXT,
                 problem TEXT,
                 solution TEXT,
@@ -123,7 +262,7 @@ class SelfImprovingAI:
                 solution_count INTEGER,
                 best_solution TEXT,
                 avg_fix_time REAL,
-                last_seen TEXT
+                last_seen INTEGER
             )
         ''')
         
@@ -136,22 +275,250 @@ class SelfImprovingAI:
                 impact_score REAL,
                 implementation_count INTEGER,
                 avg_improvement REAL,
-                created_at TEXT
+                created_at INTEGER
             )
         ''')
         
-        conn.commit()
-        conn.close()
+        for table in migrated - {"performance_metrics"}:
+            self._copy_text_timestamps(cursor, table, _TIMESTAMP_COLUMNS[table])
+        
+        # Last run of each maintenance step; a new database starts its clocks now
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS maintenance_log (
+                task TEXT PRIMARY KEY,
+                last_run INTEGER
+            )
+        ''')
+        now = _now_us()
+        cursor.executemany(
+            "INSERT OR IGNORE INTO maintenance_log VALUES (?, ?)",
+            [(task, now) for task in _MAINTENANCE_PERIODS]
+        )
+        
+        # Full-text indexes for substring-style error/problem lookups
+        self._fts_enabled = self._create_fts_index(
+            cursor, "error_patterns", "error_signature", rebuild="error_patterns" in migrated
+        )
+        self._fts_enabled = self._create_fts_index(
+            cursor, "learning_entries", "problem", rebuild="learning_entries" in migrated
+        ) and self._fts_enabled
+        
+        # Indexes for the hot filter/sort columns
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_pm_optype_ts ON performance_metrics(operation_type, timestamp)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_pm_ts ON performance_metrics(timestamp)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_le_eff ON learning_entries(effectiveness_score DESC, times_used DESC) WHERE times_used > 0")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_ep_fix_time ON error_patterns(avg_fix_time)")
+        
+        # Gather planner statistics once for databases that have never been analyzed
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+        if cursor.fetchone() is None:
+            cursor.execute("ANALYZE")
+        
+        self._conn.commit()
+    
+    def _move_aside_text_timestamps(self, cursor, table: str, column: str) -> bool:
+        """Rename table to {table}_text if its timestamp column is still ISO text"""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (f"{table}_text",))
+        if cursor.fetchone() is not None:
+            # Left behind by an earlier migration that stopped before copying its rows
+            return True
+        
+        cursor.execute(f"SELECT type FROM pragma_table_info('{table}') WHERE name = ?", (column,))
+        row = cursor.fetchone()
+        if row is None or row[0].upper() != "TEXT":
+            return False
+        
+        # Indexes would follow the renamed table and block CREATE INDEX IF NOT EXISTS on the new one
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+            (table,)
+        )
+        for (index,) in cursor.fetchall():
+            cursor.execute(f"DROP INDEX {index}")
+        cursor.execute(f"ALTER TABLE {table} RENAME TO {table}_text")
+        return True
+    
+    def _copy_text_timestamps(self, cursor, table: str, column: str):
+        """Copy rows from {table}_text into the new table, converting ISO text timestamps to epoch microseconds
+        
+        julianday() only resolves milliseconds, so round there before scaling up.
+        """
+        cursor.execute(f"SELECT name FROM pragma_table_info('{table}_text')")
+        columns = [name for (name,) in cursor.fetchall()]
+        select = ", ".join(
+            f"CAST(ROUND((julianday({name}, 'utc') - 2440587.5) * 86400000) AS INTEGER) * 1000" if name == column else name
+            for name in columns
+        )
+        # OR IGNORE: when finishing an interrupted migration, rows written since then win
+        cursor.execute(f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) SELECT {select} FROM {table}_text")
+        cursor.execute(f"DROP TABLE {table}_text")
+    
+    def _create_fts_index(self, cursor, table: str, column: str, rebuild: bool = False) -> bool:
+        """Create an FTS5 index over table.column kept in sync by triggers"""
+        fts_table = f"{table}_fts"
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (fts_table,))
+        exists = cursor.fetchone() is not None
+        
+        try:
+            cursor.execute(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table}
+                USING fts5({column}, content='{table}', content_rowid='rowid')
+            """)
+        except sqlite3.OperationalError as e:
+            # SQLite built without FTS5 - lookups fall back to LIKE
+            print(f"Full-text index unavailable: {e}")
+            return False
+        
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_fts_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts_table}(rowid, {column}) VALUES (new.rowid, new.{column});
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_fts_ad AFTER DELETE ON {table} BEGIN
+                INSERT INTO {fts_table}({fts_table}, rowid, {column}) VALUES ('delete', old.rowid, old.{column});
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_fts_au AFTER UPDATE OF {column} ON {table} BEGIN
+                INSERT INTO {fts_table}({fts_table}, rowid, {column}) VALUES ('delete', old.rowid, old.{column});
+                INSERT INTO {fts_table}(rowid, {column}) VALUES (new.rowid, new.{column});
+            END
+        """)
+        
+        # Index rows written before the full-text table existed (or copied into a rebuilt table)
+        if not exists or rebuild:
+            cursor.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+        
+        return True
+    
+    def _fts_phrase(self, text: str) -> Optional[str]:
+        """Build an FTS5 phrase query approximating a substring match on text"""
+        tokens = re.findall(r"\w+", text)
+        if not tokens:
+            return None
+        # Prefix-match the last token since the text may be cut mid-word
+        return '"' + " ".join(tokens) + '"*'
+    
+    @contextmanager
+    def _cursor(self, reuse: bool = False):
+        """Cursor on the shared connection, held under the database lock"""
+        with self._db_lock:
+            cursor = self._hot_cursor if reuse else self._conn.cursor()
+            try:
+                yield cursor
+            except Exception:
+                # Don't leave a half-written transaction open on the shared connection
+                self._conn.rollback()
+                raise
+    
+    def close(self):
+        """Optimize and close the learning database"""
+        with self._db_lock:
+            self.flush_metrics()
+            self._conn.execute("PRAGMA optimize")
+            self._conn.close()
     
     async def setup_session(self):
         """Initialize aiohttp session"""
-        if not self.session:
-            self.session = aiohttp.ClientSession()
+        if not self.session or self.session.closed:
+            # Pooled keep-alive connections shared by all search and OpenAI calls
+            connector = aiohttp.TCPConnector(
+                limit=100,
+                limit_per_host=20,
+                ttl_dns_cache=300,
+                keepalive_timeout=75,
+                enable_cleanup_closed=True
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+        
+        if self.maintenance_enabled:
+            loop = asyncio.get_running_loop()
+            task = self._maintenance_task
+            if task is None or task.done() or task.get_loop() is not loop:
+                self._maintenance_task = loop.create_task(self._maintenance_loop())
     
     async def close_session(self):
         """Close aiohttp session"""
+        task, self._maintenance_task = self._maintenance_task, None
+        if task is not None and not task.get_loop().is_closed():
+            task.cancel()
+        
         if self.session:
             await self.session.close()
+            self.session = None
+        
+        await asyncio.to_thread(self._checkpoint_database)
+    
+    def _checkpoint_database(self):
+        """Flush buffered metrics and refresh query planner statistics"""
+        self.flush_metrics()
+        
+        with self._cursor() as cursor:
+            cursor.execute("PRAGMA optimize")
+    
+    async def _maintenance_loop(self):
+        """Run due maintenance steps every maintenance_interval seconds"""
+        while True:
+            try:
+                await asyncio.to_thread(self.run_maintenance)
+            except sqlite3.Error as e:
+                print(f"Database maintenance error: {e}")
+            
+            await asyncio.sleep(self.maintenance_interval)
+    
+    def run_maintenance(self, force: bool = False):
+        """Prune old metrics and run whichever optimize/ANALYZE/VACUUM steps are due"""
+        
+        self.flush_metrics()
+        now = _now_us()
+        
+        with self._cursor() as cursor:
+            cursor.execute("SELECT task, last_run FROM maintenance_log")
+            last_run = dict(cursor.fetchall())
+            due = [
+                task for task, period in _MAINTENANCE_PERIODS.items()
+                if force or now - last_run.get(task, 0) >= period
+            ]
+            if not due:
+                return
+            
+            if "optimize" in due:
+                # op_stats keeps the lifetime aggregates, so old rows can go
+                cursor.execute(
+                    "DELETE FROM performance_metrics WHERE timestamp < ?",
+                    (now - self.metrics_retention_days * _US_PER_DAY,)
+                )
+            
+            if "analyze" in due:
+                cursor.execute("ANALYZE")
+                if self._fts_enabled:
+                    for fts_table in ("error_patterns_fts", "learning_entries_fts"):
+                        cursor.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('optimize')")
+            
+            cursor.executemany(
+                "INSERT INTO maintenance_log VALUES (?, ?) "
+                "ON CONFLICT(task) DO UPDATE SET last_run = excluded.last_run",
+                [(task, now) for task in due]
+            )
+            self._conn.commit()
+            
+            if "optimize" in due:
+                cursor.execute("PRAGMA optimize")
+            
+            # Rebuilt in place: VACUUM INTO + rename would leave the open connection on the old file
+            if "vacuum" in due:
+                cursor.execute("VACUUM")
+    
+    async def __aenter__(self):
+        await self.setup_session()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close_session()
     
     # ===== WEB SEARCH FOR ERROR SOLUTIONS =====
     
@@ -166,33 +533,39 @@ class SelfImprovingAI:
         await self.setup_session()
         
         # First, check local database for known solutions
-        local_solutions = self._search_local_knowledge(error_message)
+        local_solutions = await asyncio.to_thread(self._search_local_knowledge, error_message)
         
         if local_solutions:
             return local_solutions
         
-        # Search multiple sources
-        solutions = []
-        
-        # Search Stack Overflow
-        stackoverflow_results = await self._search_stackoverflow(error_message)
-        solutions.extend(stackoverflow_results)
-        
-        # Search GitHub Issues
-        github_results = await self._search_github_issues(error_message, context)
-        solutions.extend(github_results)
-        
-        # Search Unreal Engine forums
+        # Then recently searched errors
+        cache_key = self._solution_key(error_message, (context or {}).get("engine", ""))
+        cached = self._cache_get(self._solution_cache, cache_key)
+        if cached is not None:
+            return list(cached)
+        
+        # Search multiple sources concurrently (Stack Overflow, GitHub Issues, Unreal forums)
+        searches = [
+            self._search_stackoverflow(error_message),
+            self._search_github_issues(error_message, context)
+        ]
         if context and context.get("engine") == "unreal":
-            unreal_results = await self._search_unreal_forums(error_message)
-            solutions.extend(unreal_results)
+            searches.append(self._search_unreal_forums(error_message))
+        
+        solutions = []
+        for results in await asyncio.gather(*searches, return_exceptions=True):
+            if isinstance(results, Exception):
+                print(f"Solution search error: {results}")
+                continue
+            solutions.extend(results)
         
         # Use AI to synthesize best solution
         best_solution = await self._synthesize_solutions(error_message, solutions)
         
         # Store in learning database
-        self._store_learned_solution(error_message, best_solution, "web_search")
+        await asyncio.to_thread(self._store_learned_solution, error_message, best_solution, "web_search")
         
+        self._cache_put(self._solution_cache, cache_key, solutions, self.solution_cache_ttl)
         return solutions
     
     async def _search_stackoverflow(self, query: str) -> List[Dict[str, Any]]:
@@ -293,12 +666,17 @@ class SelfImprovingAI:
     ) -> Dict[str, Any]:
         """Use AI to synthesize best solution from multiple sources"""
         
+        cache_key = self._solution_key(error_message)
+        cached = self._cache_get(self._synthesis_cache, cache_key)
+        if cached is not None:
+            return cached
+        
         prompt = f"""Analyze these solutions for the error and provide the best approach:
 
 ERROR: {error_message}
 
 SOLUTIONS FOUND:
-{json.dumps(solutions, indent=2)}
+{_compact_json(self._compact_for_prompt(solutions))}
 
 Provide a synthesized solution in JSON format:
 {{
@@ -328,41 +706,78 @@ Provide a synthesized solution in JSON format:
             ) as response:
                 if response.status == 200:
                     result = await response.json()
-                    return json.loads(result["choices"][0]["message"]["content"])
+                    synthesis = json.loads(result["choices"][0]["message"]["content"])
+                    self._cache_put(self._synthesis_cache, cache_key, synthesis, self.solution_cache_ttl)
+                    return synthesis
         except Exception as e:
             print(f"Solution synthesis error: {e}")
         
-        return {
+        fallback = {
             "recommended_solution": "Manual review required",
             "confidence": 0.3,
             "reasoning": "Unable to synthesize solutions",
             "alternative_solutions": [],
             "estimated_fix_time": "unknown"
         }
+        # Remember failures briefly so a recurring error doesn't retry the API on every call
+        self._cache_put(self._synthesis_cache, cache_key, fallback, self.failure_cache_ttl)
+        return fallback
+    
+    def _compact_for_prompt(
+        self,
+        solutions: List[Dict[str, Any]],
+        per_source: int = 3
+    ) -> List[Dict[str, Any]]:
+        """Reduce search results to the top few title/url/score entries per source"""
+        
+        by_source: Dict[str, List[Dict[str, Any]]] = {}
+        for solution in solutions:
+            by_source.setdefault(solution.get("source", "unknown"), []).append(solution)
+        
+        compact = []
+        for source, items in by_source.items():
+            items.sort(key=lambda s: s.get("score", s.get("reactions", 0)) or 0, reverse=True)
+            for item in items[:per_source]:
+                compact.append({
+                    "source": source,
+                    "title": re.sub(r"[*_`#>\[\]]", "", item.get("title") or "")[:160],
+                    "url": item.get("url"),
+                    "score": item.get("score", item.get("reactions", 0))
+                })
+        
+        return compact
     
     def _search_local_knowledge(self, error_message: str) -> List[Dict[str, Any]]:
         """Search local learning database for known solutions"""
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Search error patterns
-        cursor.execute(
-            "SELECT * FROM error_patterns WHERE error_signature LIKE ? ORDER BY avg_fix_time ASC LIMIT 5",
-            (f"%{error_message[:50]}%",)
-        )
+        phrase = self._fts_phrase(error_message[:50]) if self._fts_enabled else None
+        
+        with self._cursor() as cursor:
+            # Search error patterns
+            if phrase:
+                cursor.execute('''
+                    SELECT ep.error_type, ep.best_solution, ep.avg_fix_time FROM error_patterns ep
+                    JOIN error_patterns_fts ON error_patterns_fts.rowid = ep.rowid
+                    WHERE error_patterns_fts MATCH ?
+                    ORDER BY ep.avg_fix_time ASC LIMIT 5
+                ''', (phrase,))
+            else:
+                cursor.execute(
+                    "SELECT error_type, best_solution, avg_fix_time FROM error_patterns "
+                    "WHERE error_signature LIKE ? ORDER BY avg_fix_time ASC LIMIT 5",
+                    (f"%{error_message[:50]}%",)
+                )
+            
+            results = []
+            for error_type, best_solution, avg_fix_time in cursor:
+                results.append({
+                    "source": "local_knowledge",
+                    "error_type": error_type,
+                    "best_solution": best_solution,
+                    "avg_fix_time": avg_fix_time,
+                    "confidence": 0.9  # High confidence for known patterns
+                })
         
-        results = []
-        for row in cursor.fetchall():
-            results.append({
-                "source": "local_knowledge",
-                "error_type": row[2],
-                "best_solution": row[4],
-                "avg_fix_time": row[5],
-                "confidence": 0.9  # High confidence for known patterns
-            })
-        
-        conn.close()
         return results
     
     # ===== PERFORMANCE TRACKING =====
@@ -376,12 +791,8 @@ Provide a synthesized solution in JSON format:
         operation_id = self._generate_id(operation_type)
         start_time = time.time()
         
-        # Store in memory
-        self.performance_history.append({
-            "operation_id": operation_id,
-            "operation_type": operation_type,
-            "start_time": start_time
-        })
+        # Store in memory until the operation ends
+        self._in_flight[operation_id] = (operation_type, start_time)
         
         return operation_id
     
@@ -398,18 +809,19 @@ Provide a synthesized solution in JSON format:
         
         end_time = time.time()
         
-        # Find operation in history
-        operation = next((op for op in self.performance_history if op["operation_id"] == operation_id), None)
+        # Find operation among those in flight
+        operation = self._in_flight.pop(operation_id, None)
         
         if not operation:
             return
         
-        duration = end_time - operation["start_time"]
+        operation_type, start_time = operation
+        duration = end_time - start_time
         
         metrics = PerformanceMetrics(
             operation_id=operation_id,
-            operation_type=operation["operation_type"],
-            start_time=operation["start_time"],
+            operation_type=operation_type,
+            start_time=start_time,
             end_time=end_time,
             duration=duration,
             success=success,
@@ -426,55 +838,100 @@ Provide a synthesized solution in JSON format:
         self._analyze_performance(metrics)
     
     def _store_metrics(self, metrics: PerformanceMetrics):
-        """Store metrics in database"""
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        """Store metrics in database (buffered, see flush_metrics)"""
+        
+        with self._db_lock:
+            self._pending_updates[metrics.operation_type] += 1
+            if not self._metrics_buffer:
+                self._metrics_buffered_since = time.monotonic()
+                self._metrics_flush_timer = threading.Timer(self.metrics_flush_interval, self._flush_aged_metrics)
+                self._metrics_flush_timer.daemon = True
+                self._metrics_flush_timer.start()
+            self._metrics_buffer.append((
+                metrics.operation_id,
+                metrics.operation_type,
+                metrics.start_time,
+                metrics.end_time,
+                metrics.duration,
+                1 if metrics.success else 0,
+                metrics.error_message,
+                metrics.confidence_score,
+                metrics.tokens_used,
+                metrics.quality_score,
+                metrics.user_feedback,
+                _now_us()
+            ))
+            
+            if (len(self._metrics_buffer) >= self.metrics_flush_every
+                    or time.monotonic() - self._metrics_buffered_since >= self.metrics_flush_interval):
+                self.flush_metrics()
+    
+    def _flush_aged_metrics(self):
+        """Timer callback: write the buffer once its oldest row reaches metrics_flush_interval"""
+        try:
+            self.flush_metrics()
+        except sqlite3.Error as e:
+            print(f"Metrics flush error: {e}")
+    
+    def flush_metrics(self):
+        """Write buffered metrics in a single transaction"""
         
-        cursor.execute('''
-            INSERT INTO performance_metrics VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            metrics.operation_id,
-            metrics.operation_type,
-            metrics.start_time,
-            metrics.end_time,
-            metrics.duration,
-            1 if metrics.success else 0,
-            metrics.error_message,
-            metrics.confidence_score,
-            metrics.tokens_used,
-            metrics.quality_score,
-            metrics.user_feedback,
-            datetime.now().isoformat()
-        ))
-        
-        conn.commit()
-        conn.close()
+        with self._db_lock:
+            if not self._metrics_buffer:
+                return
+            
+            with self._cursor(reuse=True) as cursor:
+                cursor.executemany(_SQL_INSERT_METRIC, self._metrics_buffer)
+                cursor.executemany(_SQL_UPSERT_OP_STATS, [(row[1], row[5], row[4], row[9] or 0) for row in self._metrics_buffer])
+                
+                self._conn.commit()
+                self._metrics_buffer.clear()
+            
+            self._metrics_buffered_since = None
+            if self._metrics_flush_timer is not None:
+                self._metrics_flush_timer.cancel()
+                self._metrics_flush_timer = None
     
     def _analyze_performance(self, metrics: PerformanceMetrics):
         """Analyze performance and identify improvements"""
         
-        # Calculate success rate for operation type
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT 
-                COUNT(*) as total,
-                SUM(success) as successes,
-                AVG(duration) as avg_duration,
-                AVG(quality_score) as avg_quality
-            FROM performance_metrics
-            WHERE operation_type = ?
-        ''', (metrics.operation_type,))
+        op_type = metrics.operation_type
         
-        row = cursor.fetchone()
-        total, successes, avg_duration, avg_quality = row
+        # Calculate success rate for operation type
+        with self._db_lock:
+            totals = self._op_totals.get(op_type)
+            
+            if totals is not None and self._pending_updates[op_type] < self.op_stats_resync_every:
+                # Roll the cached aggregates forward in memory
+                totals[0] += 1
+                totals[1] += 1 if metrics.success else 0
+                totals[2] += metrics.duration
+                totals[3] += metrics.quality_score or 0
+            else:
+                # Re-read persisted aggregates (plus rows still in the write buffer)
+                with self._cursor(reuse=True) as cursor:
+                    cursor.execute(_SQL_SELECT_OP_STATS, (op_type,))
+                    row = cursor.fetchone()
+                
+                totals = list(row) if row else [0, 0, 0.0, 0.0]
+                for buffered in self._metrics_buffer:
+                    if buffered[1] == op_type:
+                        totals[0] += 1
+                        totals[1] += buffered[5]
+                        totals[2] += buffered[4]
+                        totals[3] += buffered[9] or 0
+                
+                self._op_totals[op_type] = totals
+                self._pending_updates[op_type] = 0
+            
+            total, successes, sum_duration, sum_quality = totals
         
         success_rate = successes / total if total > 0 else 0
+        avg_duration = sum_duration / total if total > 0 else 0
+        avg_quality = sum_quality / total if total > 0 else 0
         
         # Store in cache
-        self.success_rate_cache[metrics.operation_type] = {
+        self.success_rate_cache[op_type] = {
             "success_rate": success_rate,
             "avg_duration": avg_duration,
             "avg_quality": avg_quality,
@@ -484,17 +941,15 @@ Provide a synthesized solution in JSON format:
         # Identify if performance is degrading
         if success_rate < 0.7:
             self._create_improvement_insight(
-                f"Low success rate for {metrics.operation_type}",
+                f"Low success rate for {op_type}",
                 success_rate
             )
         
         if avg_duration > 30:  # More than 30 seconds
             self._create_improvement_insight(
-                f"Slow performance for {metrics.operation_type}",
+                f"Slow performance for {op_type}",
                 avg_duration
             )
-        
-        conn.close()
     
     # ===== LEARNING & IMPROVEMENT =====
     
@@ -510,142 +965,120 @@ Provide a synthesized solution in JSON format:
         
         learning_entry = LearningEntry(
             entry_id=entry_id,
-            timestamp=datetime.now().isoformat(),
+            timestamp=_now_us(),
             category="error_solution",
             problem=problem,
-            solution=json.dumps(solution),
+            solution=_compact_json(solution),
             success_rate=solution.get("confidence", 0.5),
             times_used=0,
             effectiveness_score=0.0,
             source=source
         )
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO learning_entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            learning_entry.entry_id,
-            learning_entry.timestamp,
-            learning_entry.category,
-            learning_entry.problem,
-            learning_entry.solution,
-            learning_entry.success_rate,
-            learning_entry.times_used,
-            learning_entry.effectiveness_score,
-            learning_entry.source
-        ))
-        
-        conn.commit()
-        conn.close()
+        with self._cursor() as cursor:
+            cursor.execute(_SQL_INSERT_LEARNING, (
+                learning_entry.entry_id,
+                learning_entry.timestamp,
+                learning_entry.category,
+                learning_entry.problem,
+                learning_entry.solution,
+                learning_entry.success_rate,
+                learning_entry.times_used,
+                learning_entry.effectiveness_score,
+                learning_entry.source
+            ))
+            
+            self._conn.commit()
     
     def record_solution_success(self, problem: str, worked: bool):
         """Record whether a solution worked"""
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "SELECT entry_id, times_used, effectiveness_score FROM learning_entries WHERE problem LIKE ?",
-            (f"%{problem[:50]}%",)
-        )
-        
-        row = cursor.fetchone()
-        if row:
-            entry_id, times_used, effectiveness_score = row
-            
-            # Update effectiveness
-            new_times_used = times_used + 1
-            if worked:
-                new_effectiveness = (effectiveness_score * times_used + 1.0) / new_times_used
-            else:
-                new_effectiveness = (effectiveness_score * times_used + 0.0) / new_times_used
-            
-            cursor.execute('''
-                UPDATE learning_entries 
-                SET times_used = ?, effectiveness_score = ?
-                WHERE entry_id = ?
-            ''', (new_times_used, new_effectiveness, entry_id))
+        phrase = self._fts_phrase(problem[:50]) if self._fts_enabled else None
+        
+        if phrase:
+            match_sql = '''
+                SELECT learning_entries_fts.rowid FROM learning_entries_fts
+                WHERE learning_entries_fts MATCH ?
+                LIMIT 1
+            '''
+            match_param = phrase
+        else:
+            match_sql = "SELECT rowid FROM learning_entries WHERE problem LIKE ? LIMIT 1"
+            match_param = f"%{problem[:50]}%"
+        
+        # Single statement: SQLite evaluates every right-hand side with the old
+        # row values, so the running mean stays correct without a read-modify-write
+        with self._cursor() as cursor:
+            cursor.execute(f'''
+                UPDATE learning_entries
+                SET times_used = times_used + 1,
+                    effectiveness_score = (effectiveness_score * times_used + ?) / (times_used + 1)
+                WHERE rowid = ({match_sql})
+            ''', (1.0 if worked else 0.0, match_param))
             
-            conn.commit()
-        
-        conn.close()
+            self._conn.commit()
     
     def _create_improvement_insight(self, description: str, impact_score: float):
         """Create an improvement insight"""
         
         insight_id = self._generate_id(description)
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._cursor() as cursor:
+            cursor.execute(_SQL_INSERT_INSIGHT, (
+                insight_id,
+                "performance",
+                description,
+                impact_score,
+                0,
+                0.0,
+                _now_us()
+            ))
+            
+            self._conn.commit()
+    
+    def _collect_reflection_data(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Gather per-operation performance and per-category learning aggregates"""
         
-        cursor.execute('''
-            INSERT OR IGNORE INTO optimization_insights VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            insight_id,
-            "performance",
-            description,
-            impact_score,
-            0,
-            0.0,
-            datetime.now().isoformat()
-        ))
-        
-        conn.commit()
-        conn.close()
+        self.flush_metrics()
+        
+        performance_data = []
+        learning_data = []
+        
+        with self._cursor(reuse=True) as cursor:
+            cursor.execute(_SQL_REFLECTION_AGGREGATES, (_now_us() - 7 * _US_PER_DAY,))
+            
+            for kind, key, first, second, third in cursor:
+                if kind == "perf":
+                    performance_data.append({
+                        "operation_type": key,
+                        "avg_duration": first,
+                        "avg_quality": second,
+                        "success_rate": third
+                    })
+                else:
+                    learning_data.append({
+                        "category": key,
+                        "avg_effectiveness": first,
+                        "entries": second
+                    })
+        
+        return performance_data, learning_data
     
     async def reflect_and_improve(self) -> Dict[str, Any]:
         """
         Reflect on recent performance and identify improvements
         """
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Get recent performance data
-        cursor.execute('''
-            SELECT operation_type, AVG(duration), AVG(quality_score), AVG(success)
-            FROM performance_metrics
-            WHERE timestamp > datetime('now', '-7 days')
-            GROUP BY operation_type
-        ''')
-        
-        performance_data = []
-        for row in cursor.fetchall():
-            performance_data.append({
-                "operation_type": row[0],
-                "avg_duration": row[1],
-                "avg_quality": row[2],
-                "success_rate": row[3]
-            })
-        
-        # Get learning effectiveness
-        cursor.execute('''
-            SELECT category, AVG(effectiveness_score), COUNT(*)
-            FROM learning_entries
-            WHERE times_used > 0
-            GROUP BY category
-        ''')
-        
-        learning_data = []
-        for row in cursor.fetchall():
-            learning_data.append({
-                "category": row[0],
-                "avg_effectiveness": row[1],
-                "entries": row[2]
-            })
-        
-        conn.close()
+        performance_data, learning_data = await asyncio.to_thread(self._collect_reflection_data)
         
         # Use AI to analyze and suggest improvements
         reflection_prompt = f"""Analyze this AI system's performance and suggest improvements:
 
 PERFORMANCE DATA:
-{json.dumps(performance_data, indent=2)}
+{_compact_json(performance_data)}
 
 LEARNING DATA:
-{json.dumps(learning_data, indent=2)}
+{_compact_json(learning_data)}
 
 Provide analysis in JSON format:
 {{
@@ -687,7 +1120,8 @@ Provide analysis in JSON format:
                     
                     # Store insights
                     for priority in reflection.get("improvement_priorities", []):
-                        self._create_improvement_insight(
+                        await asyncio.to_thread(
+                            self._create_improvement_insight,
                             priority.get("recommended_action", ""),
                             priority.get("current_metric", 0.0)
                         )
@@ -706,87 +1140,110 @@ Provide analysis in JSON format:
     def get_performance_report(self, days: int = 7) -> Dict[str, Any]:
         """Generate performance report"""
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute(f'''
-            SELECT 
-                operation_type,
-                COUNT(*) as total,
-                SUM(success) as successes,
-                AVG(duration) as avg_duration,
-                AVG(quality_score) as avg_quality,
-                AVG(confidence_score) as avg_confidence
-            FROM performance_metrics
-            WHERE timestamp > datetime('now', '-{days} days')
-            GROUP BY operation_type
-        ''')
-        
-        report = {
-            "period_days": days,
-            "generated_at": datetime.now().isoformat(),
-            "operations": []
-        }
+        self.flush_metrics()
         
-        for row in cursor.fetchall():
-            op_type, total, successes, avg_dur, avg_qual, avg_conf = row
+        with self._cursor() as cursor:
+            cursor.execute('''
+                SELECT 
+                    operation_type,
+                    COUNT(*) as total,
+                    SUM(success) as successes,
+                    AVG(duration) as avg_duration,
+                    AVG(quality_score) as avg_quality,
+                    AVG(confidence_score) as avg_confidence
+                FROM performance_metrics
+                WHERE timestamp > ?
+                GROUP BY operation_type
+            ''', (_now_us() - int(days * _US_PER_DAY),))
             
-            report["operations"].append({
-                "type": op_type,
-                "total_count": total,
-                "success_count": successes,
-                "success_rate": successes / total if total > 0 else 0,
-                "avg_duration_sec": avg_dur,
-                "avg_quality": avg_qual,
-                "avg_confidence": avg_conf
-            })
-        
-        # Get learning stats
-        cursor.execute('''
-            SELECT COUNT(*), AVG(effectiveness_score)
-            FROM learning_entries
-            WHERE times_used > 0
-        ''')
-        
-        row = cursor.fetchone()
-        report["learning_stats"] = {
-            "active_entries": row[0],
-            "avg_effectiveness": row[1]
-        }
+            report = {
+                "period_days": days,
+                "generated_at": datetime.now().isoformat(),
+                "operations": []
+            }
+            
+            for op_type, total, successes, avg_dur, avg_qual, avg_conf in cursor:
+                report["operations"].append({
+                    "type": op_type,
+                    "total_count": total,
+                    "success_count": successes,
+                    "success_rate": successes / total if total > 0 else 0,
+                    "avg_duration_sec": avg_dur,
+                    "avg_quality": avg_qual,
+                    "avg_confidence": avg_conf
+                })
+            
+            # Get learning stats
+            cursor.execute('''
+                SELECT COUNT(*), AVG(effectiveness_score)
+                FROM learning_entries
+                WHERE times_used > 0
+            ''')
+            
+            row = cursor.fetchone()
+            report["learning_stats"] = {
+                "active_entries": row[0],
+                "avg_effectiveness": row[1]
+            }
         
-        conn.close()
         return report
     
     def get_top_solutions(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get most effective solutions"""
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT problem, solution, effectiveness_score, times_used, source
-            FROM learning_entries
-            WHERE times_used > 0
-            ORDER BY effectiveness_score DESC, times_used DESC
-            LIMIT ?
-        ''', (limit,))
+        with self._cursor() as cursor:
+            cursor.execute('''
+                SELECT problem, solution, effectiveness_score, times_used, source
+                FROM learning_entries
+                WHERE times_used > 0
+                ORDER BY effectiveness_score DESC, times_used DESC
+                LIMIT ?
+            ''', (limit,))
+            
+            solutions = []
+            for problem, solution, effectiveness, times_used, source in cursor:
+                solutions.append({
+                    "problem": problem,
+                    "solution": json.loads(solution) if solution.startswith('{') else solution,
+                    "effectiveness": effectiveness,
+                    "times_used": times_used,
+                    "source": source
+                })
         
-        solutions = []
-        for row in cursor.fetchall():
-            solutions.append({
-                "problem": row[0],
-                "solution": json.loads(row[1]) if row[1].startswith('{') else row[1],
-                "effectiveness": row[2],
-                "times_used": row[3],
-                "source": row[4]
-            })
-        
-        conn.close()
         return solutions
     
     # ===== HELPER METHODS =====
     
+    def _solution_key(self, error_message: str, engine: str = "") -> str:
+        """Cache key for an error message"""
+        return hashlib.blake2b(f"{error_message}|{engine}".encode(), digest_size=16).hexdigest()
+    
+    def _cache_get(self, cache: OrderedDict, key: str) -> Any:
+        """Get a live cache entry, refreshing its LRU position"""
+        with self._cache_lock:
+            entry = cache.get(key)
+            if entry is None:
+                return None
+            
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del cache[key]
+                return None
+            
+            cache.move_to_end(key)
+            return value
+    
+    def _cache_put(self, cache: OrderedDict, key: str, value: Any, ttl: float):
+        """Store a cache entry, evicting the least recently used beyond the size limit"""
+        with self._cache_lock:
+            cache[key] = (time.monotonic() + ttl, value)
+            cache.move_to_end(key)
+            while len(cache) > self.solution_cache_size:
+                cache.popitem(last=False)
+    
     def _generate_id(self, text: str) -> str:
         """Generate unique ID"""
-        timestamp = str(time.time())
-        return hashlib.md5(f"{text}{timestamp}".encode()).hexdigest()[:12]
+        return hashlib.blake2b(
+            f"{text}{time.time_ns()}{next(self._id_counter)}".encode(),
+            digest_size=6
+        ).hexdigest()
@@ -0,0 +1,44 @@
+"""
+Response cache keys for unreal_ai_architect_enhanced
+Requests that differ by a negation or a number must never share a key
+"""
+
+import importlib.util
+import unittest
+
+_GUI_DEPS = all(
+    importlib.util.find_spec(name) is not None
+    for name in ("customtkinter", "aiohttp", "dotenv")
+)
+
+
+@unittest.skipUnless(_GUI_DEPS, "unreal_ai_architect_enhanced needs customtkinter, aiohttp and python-dotenv")
+class CanonicalWordsTest(unittest.TestCase):
+    
+    def setUp(self):
+        from unreal_ai_architect_enhanced import _canonical_words
+        self.canonical = _canonical_words
+    
+    def test_negation_does_not_collide(self):
+        for negated in ("cannot fly", "can not fly", "can't fly", "not fly"):
+            self.assertNotEqual(self.canonical("can fly"), self.canonical(negated))
+        self.assertNotEqual(
+            self.canonical("add health regeneration"),
+            self.canonical("add without health regeneration")
+        )
+    
+    def test_numbers_are_kept(self):
+        self.assertNotEqual(
+            self.canonical("inventory with 20 items"),
+            self.canonical("inventory with 50 items")
+        )
+    
+    def test_filler_is_ignored(self):
+        self.assertEqual(
+            self.canonical("Please create an Actor for a door"),
+            self.canonical("create actor door")
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,35 +10,152 @@ Integrated with C++ AI Automation Platform features:
 
 import customtkinter as ctk
 import socket
+import select
 import json
 import threading
+import queue
 import time
 import os
 import asyncio
 import aiohttp
+import functools
+import hashlib
+from collections import OrderedDict
 from datetime import datetime
 from dotenv import load_dotenv
 from typing import Optional, Dict, List, Any
 import re
+from urllib.parse import urlsplit, urlunsplit
+
+# Optional libuv-backed event loop; falls back to the stdlib loop (e.g. on Windows)
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
+
+def _health_url(api_url):
+    """Health endpoint next to the API root: a trailing /api path segment is replaced by /health"""
+    parts = urlsplit(api_url)
+    path = parts.path.rstrip("/")
+    if path.endswith("/api"):
+        path = path[:-len("/api")]
+    return urlunsplit((parts.scheme, parts.netloc, path + "/health", "", ""))
 
 # --- CONFIGURATION ---
 load_dotenv()
 
 UNREAL_HOST = os.getenv("UNREAL_HOST", "127.0.0.1")
 UNREAL_PORT = int(os.getenv("UNREAL_PORT", 30010))
+# Opt-in: keep one connection open and length-prefix each message. Needs an Unreal
+# listener that reads framed messages; the default sends one raw JSON message per connection.
+UNREAL_FRAMED = os.getenv("UNREAL_FRAMED", "").lower() in ("1", "true", "yes")
 
 # C++ AI Platform API Configuration
 CPP_AI_API_URL = os.getenv("CPP_AI_API_URL", "http://localhost:8000/api")
+CPP_AI_HEALTH_URL = _health_url(CPP_AI_API_URL)
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 HUGGINGFACE_API_KEY = os.getenv("HUGGINGFACE_API_KEY", "")
 
-# Ensure output directories exist
-os.makedirs("assets/models", exist_ok=True)
-os.makedirs("assets/audio", exist_ok=True)
-os.makedirs("assets/scripts", exist_ok=True)
-os.makedirs("assets/code_generated", exist_ok=True)
-os.makedirs("assets/build_files", exist_ok=True)
-os.makedirs("logs", exist_ok=True)
+# Ensure output directories exist (one stat each on normal launches; makedirs only when missing)
+OUTPUT_DIRS = (
+    "assets/models",
+    "assets/audio",
+    "assets/scripts",
+    "assets/code_generated",
+    "assets/build_files",
+    "logs",
+)
+for _dir in OUTPUT_DIRS:
+    if not os.path.isdir(_dir):
+        os.makedirs(_dir, exist_ok=True)
+
+# Intent keywords, in task order: (group, worker, action, keywords)
+INTENT_RULES = [
+    ("cpp", "ARCHITECT_PRO", "generate_cpp_advanced", ["code", "script", "class", "actor", "component", "c++"]),
+    ("error", "ERROR_DOCTOR", "analyze_and_fix", ["error", "fix", "debug", "crash", "compile"]),
+    ("refine", "ARCHITECT_PRO", "refine_code", ["refine", "improve", "optimize", "better"]),
+    ("build", "BUILD_MASTER", "generate_build_files", ["build", "module", ".build.cs", "dependencies"]),
+    ("asset", "GENESIS", "generate_3d", ["asset", "model", "mesh"]),
+    ("audio", "SYMPHONY", "compose_music", ["music", "sound", "audio"]),
+    ("level", "HOLODECK", "edit_level", ["level", "light", "scene"]),
+    ("trailer", "HYPE_BEAST", "edit_trailer", ["trailer"])
+]
+
+def _trie_pattern(words):
+    """Regex alternation factored by common prefix, e.g. code|class|c++ -> c(?:ode|lass|\+\+)"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}  # end of word
+    
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in node.items() if char]
+        if "" in node:
+            # Any keyword ending here already matches; longer ones add nothing for a lookahead
+            return ""
+        if len(branches) == 1:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")"
+    
+    return build(trie)
+
+# All groups in one pattern; the lookahead finds keywords anywhere (substring
+# match, as before) including ones that overlap a keyword from another group.
+# Each group is a prefix trie, so shared prefixes are only tried once per position.
+_INTENT_RE = re.compile("(?=" + "|".join(
+    f"(?P<{name}>{_trie_pattern(words)})" for name, _, _, words in INTENT_RULES
+) + ")")
+
+@functools.lru_cache(maxsize=128)
+def _match_intent_groups(normalized_prompt: str) -> frozenset:
+    """Keyword groups present in a lowercased, whitespace-collapsed prompt"""
+    return frozenset(m.lastgroup for m in _INTENT_RE.finditer(normalized_prompt))
+
+# Generated sources are tens of KB; a 256 KiB buffer flushes each in one write() call
+_WRITE_BUFFER = 1 << 18
+
+def _write_text(path, content):
+    """Write a generated file; called via asyncio.to_thread so the event loop keeps running"""
+    with open(path, 'w', buffering=_WRITE_BUFFER) as f:
+        f.write(content)
+
+async def _read_json(response):
+    """Parse a JSON body straight from its bytes (response.json() strips and decodes extra copies first)"""
+    return json.loads(await response.read())
+
+# Word tokens used to compare requests for the response cache ("c++" and ".build.cs" stay whole)
+_TOKEN_RE = re.compile(r"[\w+.#]+")
+
+# Words that invert a request; never dropped as filler
+_NEGATIONS = frozenset(["not", "no", "never", "without", "none", "nor"])
+
+# Filler words that don't change what is being asked for
+_STOPWORDS = frozenset([
+    "a", "an", "the", "please", "can", "could", "would", "you", "me", "i",
+    "want", "need", "some", "my", "just", "kindly", "to", "for", "of"
+]) - _NEGATIONS
+
+# Contracted negations spelled out, so "can't fly" and "cannot fly" keep their "not"
+_CONTRACTION_RE = re.compile(r"\b(?:(can)(?:'|\u2019)t|(can)not|(won)(?:'|\u2019)t|(\w+)n(?:'|\u2019)t)\b")
+
+def _expand_negations(text):
+    """Rewrite negative contractions as "<verb> not" """
+    def expand(match):
+        verb = next(group for group in match.groups() if group)
+        return ("will" if verb == "won" else verb) + " not"
+    return _CONTRACTION_RE.sub(expand, text)
+
+def _canonical_words(text):
+    """
+    Lowercased request words without filler, so rephrasings of the same request share
+    a cache key. Negations and numbers are kept: "not X" and "X", or 20 and 50 items,
+    are different requests
+    """
+    words = _TOKEN_RE.findall(_expand_negations(text.lower()))
+    return [w for w in words if w not in _STOPWORDS] or words
 
 # --- 1. ENHANCED DIRECTOR BRAIN (With C++ AI Integration) ---
 class EnhancedDirectorBrain:
@@ -52,78 +169,26 @@ class EnhancedDirectorBrain:
         """
         Enhanced intent analysis with C++ AI platform integration
         """
-        prompt_lower = prompt.lower()
+        # Keywords never contain whitespace, so collapsing it keeps matches identical
+        # while letting repeated or re-spaced prompts share a cache entry
+        matched = _match_intent_groups(" ".join(prompt.lower().split()))
         tasks = []
 
-        # C++ Code Generation (Enhanced)
-        if any(word in prompt_lower for word in ["code", "script", "class", "actor", "component", "c++"]):
-            tasks.append({
-                "worker": "ARCHITECT_PRO", 
-                "action": "generate_cpp_advanced",
-                "details": prompt,
-                "features": {
-                    "validation": True,
-                    "build_files": True,
-                    "error_check": True,
-                    "optimization": True
+        for name, worker, action, _ in INTENT_RULES:
+            if name in matched:
+                task = {
+                    "worker": worker,
+                    "action": action,
+                    "details": prompt
                 }
-            })
-        
-        # Error Analysis and Fixing
-        if any(word in prompt_lower for word in ["error", "fix", "debug", "crash", "compile"]):
-            tasks.append({
-                "worker": "ERROR_DOCTOR",
-                "action": "analyze_and_fix",
-                "details": prompt
-            })
-        
-        # Code Refinement
-        if any(word in prompt_lower for word in ["refine", "improve", "optimize", "better"]):
-            tasks.append({
-                "worker": "ARCHITECT_PRO",
-                "action": "refine_code",
-                "details": prompt
-            })
-        
-        # Build System Generation
-        if any(word in prompt_lower for word in ["build", "module", ".build.cs", "dependencies"]):
-            tasks.append({
-                "worker": "BUILD_MASTER",
-                "action": "generate_build_files",
-                "details": prompt
-            })
-
-        # Asset Generation (Original)
-        if any(word in prompt_lower for word in ["asset", "model", "mesh"]):
-            tasks.append({
-                "worker": "GENESIS", 
-                "action": "generate_3d",
-                "details": prompt
-            })
-        
-        # Audio Generation (Original)
-        if any(word in prompt_lower for word in ["music", "sound", "audio"]):
-            tasks.append({
-                "worker": "SYMPHONY",
-                "action": "compose_music",
-                "details": prompt
-            })
-            
-        # Level Editing (Original)
-        if any(word in prompt_lower for word in ["level", "light", "scene"]):
-            tasks.append({
-                "worker": "HOLODECK",
-                "action": "edit_level",
-                "details": prompt
-            })
-
-        # Marketing (Original)
-        if "trailer" in prompt_lower:
-            tasks.append({
-                "worker": "HYPE_BEAST",
-                "action": "edit_trailer",
-                "details": prompt
-            })
+                if name == "cpp":
+                    task["features"] = {
+                        "validation": True,
+                        "build_files": True,
+                        "error_check": True,
+                        "optimization": True
+                    }
+                tasks.append(task)
             
         # Default
         if not tasks:
@@ -151,24 +216,92 @@ class EnhancedUnrealBridge:
         self.host = UNREAL_HOST
         self.port = UNREAL_PORT
         self.connected = False
+        self.framed = UNREAL_FRAMED
+        # Persistent connection (framed mode only), reopened lazily after any socket error
+        self._sock: Optional[socket.socket] = None
+        self._lock = threading.Lock()
+    
+    def _ensure_connected(self):
+        """Open the kept-alive connection to Unreal if there isn't one"""
+        if self._sock is not None:
+            # Readable while idle means Unreal closed its end (or sent data we don't expect)
+            try:
+                readable, _, _ = select.select([self._sock], [], [], 0)
+                if readable and not self._sock.recv(1, socket.MSG_PEEK):
+                    self._drop_connection()
+            except OSError:
+                self._drop_connection()
+        
+        if self._sock is None:
+            sock = socket.create_connection((self.host, self.port), timeout=2.0)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._sock = sock
+        return self._sock
+    
+    def _drop_connection(self):
+        """Close the connection so the next command reconnects"""
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+        
+    def check_alive(self):
+        """Report whether Unreal is reachable; a live framed connection is checked without sending anything"""
+        if not self.framed:
+            return self.send_command("PING", {})
+        with self._lock:
+            try:
+                self._ensure_connected()
+                self.connected = True
+            except OSError:
+                self._drop_connection()
+                self.connected = False
+            return self.connected
         
     def send_command(self, command, data):
         """Send command to Unreal Engine"""
-        try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.settimeout(2.0)
-                s.connect((self.host, self.port))
-                msg = json.dumps({"cmd": command, "data": data})
-                s.sendall(msg.encode('utf-8'))
+        if not self.framed:
+            try:
+                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+                    s.settimeout(2.0)
+                    s.connect((self.host, self.port))
+                    msg = json.dumps({"cmd": command, "data": data})
+                    s.sendall(msg.encode('utf-8'))
+                    self.connected = True
+                    return True
+            except ConnectionRefusedError:
+                self.connected = False
+                return False
+            except Exception as e:
+                print(f"Bridge Error: {e}")
+                self.connected = False
+                return False
+        
+        # Framed: 4-byte big-endian length + JSON on the kept-alive connection
+        with self._lock:
+            try:
+                msg = json.dumps({"cmd": command, "data": data}).encode('utf-8')
+                frame = len(msg).to_bytes(4, 'big') + msg
+                try:
+                    self._ensure_connected().sendall(frame)
+                except OSError:
+                    # Unreal may have closed the idle connection; retry once on a fresh one
+                    self._drop_connection()
+                    self._ensure_connected().sendall(frame)
                 self.connected = True
                 return True
-        except ConnectionRefusedError:
-            self.connected = False
-            return False
-        except Exception as e:
-            print(f"Bridge Error: {e}")
-            self.connected = False
-            return False
+            except ConnectionRefusedError:
+                self._drop_connection()
+                self.connected = False
+                return False
+            except Exception as e:
+                print(f"Bridge Error: {e}")
+                self._drop_connection()
+                self.connected = False
+                return False
     
     def import_cpp_code(self, file_path, module_name):
         """Import generated C++ code into Unreal project"""
@@ -191,21 +324,84 @@ class EnhancedWorkers:
         self.auth_token = auth_token
         self.session = None
         
+        # Responses from the slow AI endpoints: key -> response, oldest first.
+        # Hits need the same endpoint/options and the same canonical request words.
+        self._response_cache: OrderedDict = OrderedDict()
+        self.response_cache_size = 256
+        
+        # Most recently written .cpp file (generated, fixed or refined)
+        self.last_cpp_path = None
+        
     async def setup_session(self):
-        """Setup async HTTP session"""
-        if not self.session:
+        """Setup async HTTP session (created once, on the app's shared event loop)"""
+        if not self.session or self.session.closed:
             headers = {}
             if self.auth_token:
                 headers["Authorization"] = f"Bearer {self.auth_token}"
-            self.session = aiohttp.ClientSession(headers=headers)
+            # Keep-alive pool reused by every call to the C++ AI API
+            connector = aiohttp.TCPConnector(
+                limit=32,
+                limit_per_host=16,
+                keepalive_timeout=75,
+                ttl_dns_cache=300
+            )
+            # Fail fast on connect, but give long AI generations time to respond
+            timeout = aiohttp.ClientTimeout(total=None, sock_connect=5, sock_read=60)
+            self.session = aiohttp.ClientSession(connector=connector, headers=headers, timeout=timeout)
+    
+    async def close_session(self):
+        """Close async HTTP session"""
+        if self.session:
+            await self.session.close()
+            self.session = None
+    
+    def _cache_lookup(self, scope, text, canonical=True):
+        """Return (key, cached response or None) for a request"""
+        # Filler-insensitive key for prompts; exact words for anything else (e.g. error text)
+        words = _canonical_words(text) if canonical else _TOKEN_RE.findall(text.lower())
+        key = hashlib.blake2b(f"{scope}\0{' '.join(words)}".encode(), digest_size=16).hexdigest()
+        
+        cached = self._response_cache.get(key)
+        if cached is not None:
+            self._response_cache.move_to_end(key)
+        return key, cached
+    
+    def _cache_store(self, key, response):
+        """Remember a successful response, evicting the least recently used"""
+        self._response_cache[key] = response
+        self._response_cache.move_to_end(key)
+        
+        while len(self._response_cache) > self.response_cache_size:
+            self._response_cache.popitem(last=False)
+    
+    async def check_health(self, url):
+        """Return True if the API health endpoint answers 200"""
+        await self.setup_session()
+        
+        try:
+            async with self.session.get(url, timeout=aiohttp.ClientTimeout(total=2)) as response:
+                # Drain the body so the connection is kept alive for the next API call
+                await response.read()
+                return response.status == 200
+        except Exception:
+            return False
     
-    async def architect_pro_generate(self, details, features):
+    async def architect_pro_generate(self, details, features, use_cache=True):
         """
         Advanced C++ code generation with validation and build files
         Integrates with C++ AI Platform API
+        Repeats of an earlier request are served from cache (marked "cached": True)
+        unless use_cache is False
         """
+        scope = f"generate:{sorted(features.items())}"
+        cache_key, cached = self._cache_lookup(scope, details)
+        if use_cache and cached is not None and os.path.exists(cached["cpp_file"]):
+            self.last_cpp_path = cached["cpp_file"]
+            return {**cached, "cached": True}
+        
         await self.setup_session()
         
+        build_task = None
         try:
             # Generate code with AI
             async with self.session.post(
@@ -222,15 +418,19 @@ class EnhancedWorkers:
                 }
             ) as response:
                 if response.status == 200:
-                    result = await response.json()
+                    result = await _read_json(response)
+                    
+                    # Build files only need the code id; request them while the code is saved
+                    if features.get("build_files"):
+                        build_task = asyncio.create_task(self.generate_build_files(result.get("id")))
                     
                     # Save generated code
                     timestamp = int(time.time())
                     filename = f"assets/code_generated/Generated_{timestamp}.cpp"
                     header_filename = f"assets/code_generated/Generated_{timestamp}.h"
                     
-                    with open(filename, 'w') as f:
-                        f.write(result.get("generated_code", ""))
+                    await asyncio.to_thread(_write_text, filename, result.get("generated_code", ""))
+                    self.last_cpp_path = filename
                     
                     output = {
                         "cpp_file": filename,
@@ -241,17 +441,20 @@ class EnhancedWorkers:
                         "code_id": result.get("id")
                     }
                     
-                    # Generate build files if requested
-                    if features.get("build_files"):
-                        build_result = await self.generate_build_files(result.get("id"))
-                        output["build_files"] = build_result
+                    if build_task is not None:
+                        output["build_files"] = await build_task
                     
-                    return output
+                    self._cache_store(cache_key, output)
+                    return dict(output)
                 else:
                     return {"error": f"API returned status {response.status}"}
                     
         except Exception as e:
             return {"error": f"Code generation failed: {str(e)}"}
+        finally:
+            # Don't leave the build-file request running if saving the code failed
+            if build_task is not None and not build_task.done():
+                build_task.cancel()
     
     async def error_doctor_analyze(self, details):
         """
@@ -264,11 +467,23 @@ class EnhancedWorkers:
         code_context = ""
         
         # Try to read from last generated file if exists
-        code_files = sorted([f for f in os.listdir("assets/code_generated") if f.endswith(".cpp")])
-        if code_files:
-            with open(f"assets/code_generated/{code_files[-1]}", 'r') as f:
+        code_path = self.last_cpp_path
+        if not code_path or not os.path.exists(code_path):
+            code_path = self._newest_cpp_file()
+        if code_path:
+            with open(code_path, 'r') as f:
                 code_context = f.read()
         
+        # Exact repeats only: the same error against the same code
+        scope = "analyze:" + hashlib.blake2b(code_context.encode(), digest_size=16).hexdigest()
+        cache_key, cached = self._cache_lookup(scope, error_message, canonical=False)
+        if cached is not None:
+            # Point at the fix the first analysis saved; it is not applied again
+            saved_to = cached.get("auto_fix", {}).get("saved_to")
+            if saved_to and os.path.exists(saved_to):
+                self.last_cpp_path = saved_to
+            return {**cached, "cached": True}
+        
         try:
             # Analyze error
             async with self.session.post(
@@ -280,7 +495,7 @@ class EnhancedWorkers:
                 }
             ) as response:
                 if response.status == 200:
-                    analysis = await response.json()
+                    analysis = await _read_json(response)
                     
                     # Attempt auto-fix if confidence is high
                     if analysis.get("confidence_score", 0) > 0.7:
@@ -290,6 +505,7 @@ class EnhancedWorkers:
                         )
                         analysis["auto_fix"] = fix_result
                     
+                    self._cache_store(cache_key, analysis)
                     return analysis
                 else:
                     return {"error": f"Analysis failed with status {response.status}"}
@@ -297,6 +513,18 @@ class EnhancedWorkers:
         except Exception as e:
             return {"error": f"Error analysis failed: {str(e)}"}
     
+    @staticmethod
+    def _newest_cpp_file(directory="assets/code_generated"):
+        """Most recently modified .cpp file in the output directory, in one pass"""
+        newest, newest_mtime = None, -1.0
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(".cpp") and entry.is_file():
+                    mtime = entry.stat().st_mtime
+                    if mtime > newest_mtime:
+                        newest, newest_mtime = entry.path, mtime
+        return newest
+    
     async def auto_fix_error(self, error_id, code):
         """
         Automatically fix an analyzed error
@@ -313,15 +541,15 @@ class EnhancedWorkers:
                 }
             ) as response:
                 if response.status == 200:
-                    result = await response.json()
+                    result = await _read_json(response)
                     
                     # Save fixed code
                     if result.get("success") and result.get("fixed_code"):
                         timestamp = int(time.time())
                         filename = f"assets/code_generated/Fixed_{timestamp}.cpp"
-                        with open(filename, 'w') as f:
-                            f.write(result["fixed_code"])
+                        await asyncio.to_thread(_write_text, filename, result["fixed_code"])
                         result["saved_to"] = filename
+                        self.last_cpp_path = filename
                     
                     return result
                 else:
@@ -346,15 +574,15 @@ class EnhancedWorkers:
                 }
             ) as response:
                 if response.status == 200:
-                    result = await response.json()
+                    result = await _read_json(response)
                     
                     # Save refined code
                     if result.get("refined_code"):
                         timestamp = int(time.time())
                         filename = f"assets/code_generated/Refined_{timestamp}.cpp"
-                        with open(filename, 'w') as f:
-                            f.write(result["refined_code"]["generated_code"])
+                        await asyncio.to_thread(_write_text, filename, result["refined_code"]["generated_code"])
                         result["saved_to"] = filename
+                        self.last_cpp_path = filename
                     
                     return result
                 else:
@@ -375,15 +603,16 @@ class EnhancedWorkers:
                 json={"dependencies": ["Core", "CoreUObject", "Engine"]}
             ) as response:
                 if response.status == 200:
-                    result = await response.json()
+                    result = await _read_json(response)
                     
-                    # Save build files
+                    # Save build files (written concurrently)
                     saved_files = {}
+                    writes = []
                     for filename, content in result.get("files", {}).items():
                         filepath = f"assets/build_files/{filename}"
-                        with open(filepath, 'w') as f:
-                            f.write(content)
+                        writes.append(asyncio.to_thread(_write_text, filepath, content))
                         saved_files[filename] = filepath
+                    await asyncio.gather(*writes)
                     
                     return {
                         "files": saved_files,
@@ -395,19 +624,15 @@ class EnhancedWorkers:
         except Exception as e:
             return {"error": f"Build file generation failed: {str(e)}"}
     
-    # Original workers (unchanged)
-    def genesis_generate(self, details):
-        time.sleep(2) 
+    # Original workers (placeholder output, no simulated delay)
+    async def genesis_generate(self, details):
         filename = f"assets/models/{details.replace(' ', '_')[:10]}.glb"
-        with open(filename, 'w') as f:
-            f.write("DUMMY_DATA")
+        await asyncio.to_thread(_write_text, filename, "DUMMY_DATA")
         return filename
 
-    def symphony_compose(self, details):
-        time.sleep(2)
+    async def symphony_compose(self, details):
         filename = f"assets/audio/track_{int(time.time())}.wav"
-        with open(filename, 'w') as f:
-            f.write("DUMMY_AUDIO")
+        await asyncio.to_thread(_write_text, filename, "DUMMY_AUDIO")
         return filename
 
 # --- 4. ENHANCED GUI ---
@@ -423,10 +648,24 @@ class EnhancedVibeApp(ctk.CTk):
         self.bridge = EnhancedUnrealBridge()
         self.workers = EnhancedWorkers(CPP_AI_API_URL)
         
+        # One long-lived event loop for all API calls, so the workers' HTTP session is reused
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        
+        # Mode -> handler, resolved once instead of comparing mode strings per submit
+        self._dispatch = {
+            "generate": self.process_generate,
+            "debug": self.process_debug,
+            "refine": self.process_refine,
+            "build": self.process_build
+        }
+        
         # State tracking
         self.last_code_id = None
         self.last_error_id = None
         self.iteration_count = 0
+        # Canonical session counters; the stat labels only display them
+        self._counts = {"Generated": 0, "Errors Fixed": 0}
 
         # Window Setup
         self.title("Unreal AI Architect | C++ AI Platform Edition")
@@ -436,7 +675,12 @@ class EnhancedVibeApp(ctk.CTk):
         self.grid_columnconfigure(1, weight=1)
         self.grid_rowconfigure(0, weight=1)
 
+        # Log lines from any thread, written to the log box in batches by flush_log
+        self._log_queue = queue.SimpleQueue()
+        
         self.setup_ui()
+        self.after(50, self.flush_log)
+        self.protocol("WM_DELETE_WINDOW", self.on_closing)
         self.check_connection()
         
         # Status indicators
@@ -500,6 +744,12 @@ class EnhancedVibeApp(ctk.CTk):
         )
         self.log_box.grid(row=3, column=0, padx=10, pady=10, sticky="nsew")
         self.log_box.configure(state="disabled")
+        
+        # Configure tags for colors
+        self.log_box.tag_config("success", foreground="#22c55e")
+        self.log_box.tag_config("error", foreground="#ef4444")
+        self.log_box.tag_config("warning", foreground="#f59e0b")
+        self.log_box.tag_config("info", foreground="#06b6d4")
 
         # --- MAIN AREA ---
         self.main_area = ctk.CTkFrame(self, corner_radius=0, fg_color="#101010")
@@ -610,23 +860,38 @@ class EnhancedVibeApp(ctk.CTk):
 
     def log(self, sender, msg, color=None):
         now = datetime.now().strftime("%H:%M:%S")
-        self.log_box.configure(state="normal")
+        self._log_queue.put((now, sender, msg, color))
+
+    def flush_log(self, max_lines=200):
+        """Write queued log lines with one state toggle and scroll per batch"""
+        segments = []  # (text, tag) runs; uncolored text is merged into one run
+        plain = []
         
-        if color:
-            self.log_box.insert("end", f"[{now}] ", "timestamp")
-            self.log_box.insert("end", f"{sender}: ", "sender")
-            self.log_box.insert("end", f"{msg}\n", color)
-        else:
-            self.log_box.insert("end", f"[{now}] {sender}: {msg}\n")
+        for _ in range(max_lines):
+            try:
+                now, sender, msg, color = self._log_queue.get_nowait()
+            except queue.Empty:
+                break
+            
+            if color:
+                plain.append(f"[{now}] {sender}: ")
+                segments.append(("".join(plain), None))
+                segments.append((f"{msg}\n", color))
+                plain = []
+            else:
+                plain.append(f"[{now}] {sender}: {msg}\n")
         
-        self.log_box.see("end")
-        self.log_box.configure(state="disabled")
+        if plain:
+            segments.append(("".join(plain), None))
         
-        # Configure tags for colors
-        self.log_box.tag_config("success", foreground="#22c55e")
-        self.log_box.tag_config("error", foreground="#ef4444")
-        self.log_box.tag_config("warning", foreground="#f59e0b")
-        self.log_box.tag_config("info", foreground="#06b6d4")
+        if segments:
+            self.log_box.configure(state="normal")
+            for text, tag in segments:
+                self.log_box.insert("end", text, tag)
+            self.log_box.see("end")
+            self.log_box.configure(state="disabled")
+        
+        self.after(50, self.flush_log)
 
     def update_stat(self, key, value):
         """Update session statistics"""
@@ -634,35 +899,55 @@ class EnhancedVibeApp(ctk.CTk):
             self.stats_labels[key].configure(text=str(value))
 
     def check_connection(self):
-        if self.bridge.send_command("PING", {}):
+        """Check the Unreal bridge off the Tk thread (a connect attempt can block for seconds)"""
+        future = asyncio.run_coroutine_threadsafe(
+            asyncio.to_thread(self.bridge.check_alive),
+            self._loop
+        )
+        future.add_done_callback(
+            lambda f: self.after(0, self.apply_unreal_status, not f.cancelled() and f.result())
+        )
+    
+    def apply_unreal_status(self, online):
+        """Update the Unreal status label and schedule the next check"""
+        if online:
             self.unreal_status.configure(text="🟢 UNREAL ONLINE", text_color="#22c55e")
         else:
             self.unreal_status.configure(text="🔴 UNREAL OFFLINE", text_color="#ef4444")
+        # Scheduled from the result so a slow check never overlaps the next one
         self.after(5000, self.check_connection)
     
     def check_api_connection(self):
         """Check C++ AI Platform API connection"""
-        def check():
-            try:
-                import requests
-                response = requests.get(f"{CPP_AI_API_URL.replace('/api', '')}/health", timeout=2)
-                if response.status_code == 200:
-                    self.api_connected = True
-                    self.after(0, lambda: self.api_status.configure(
-                        text="🟢 C++ AI API ONLINE",
-                        text_color="#22c55e"
-                    ))
-                else:
-                    raise Exception("API not responding")
-            except:
-                self.api_connected = False
-                self.after(0, lambda: self.api_status.configure(
-                    text="🔴 C++ AI API OFFLINE",
-                    text_color="#ef4444"
-                ))
-        
-        threading.Thread(target=check, daemon=True).start()
+        future = asyncio.run_coroutine_threadsafe(
+            self.workers.check_health(CPP_AI_HEALTH_URL),
+            self._loop
+        )
+        future.add_done_callback(
+            lambda f: self.after(0, self.apply_api_status, not f.cancelled() and f.result())
+        )
         self.after(10000, self.check_api_connection)
+    
+    def apply_api_status(self, online):
+        """Update the API status label from a health check result"""
+        self.api_connected = online
+        if online:
+            self.api_status.configure(text="🟢 C++ AI API ONLINE", text_color="#22c55e")
+        else:
+            self.api_status.configure(text="🔴 C++ AI API OFFLINE", text_color="#ef4444")
+
+    def run_async(self, coro):
+        """Run a coroutine on the shared event loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+    
+    def on_closing(self):
+        """Close the HTTP session and stop the event loop before exiting"""
+        try:
+            asyncio.run_coroutine_threadsafe(self.workers.close_session(), self._loop).result(timeout=5)
+        except Exception as e:
+            print(f"Session close error: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self.destroy()
 
     def submit(self, event):
         prompt = self.entry.get()
@@ -683,24 +968,16 @@ class EnhancedVibeApp(ctk.CTk):
     def process_with_mode(self, prompt, mode):
         """Process command based on selected mode"""
         
-        if mode == "generate":
-            self.process_generate(prompt)
-        elif mode == "debug":
-            self.process_debug(prompt)
-        elif mode == "refine":
-            self.process_refine(prompt)
-        elif mode == "build":
-            self.process_build(prompt)
+        handler = self._dispatch.get(mode)
+        if handler:
+            handler(prompt)
 
     def process_generate(self, prompt):
         """Generate new C++ code"""
         self.log("ARCHITECT PRO", "Generating code with AI validation...", "info")
         
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
         try:
-            result = loop.run_until_complete(
+            result = self.run_async(
                 self.workers.architect_pro_generate(
                     prompt,
                     {
@@ -724,11 +1001,13 @@ class EnhancedVibeApp(ctk.CTk):
             
             # Update stats
             self.last_code_id = result.get("code_id")
-            current = int(self.stats_labels["Generated"].cget("text"))
-            self.update_stat("Generated", current + 1)
+            self._counts["Generated"] += 1
+            self.update_stat("Generated", self._counts["Generated"])
             
             # Log success
             quality = result.get("quality_score", 0)
+            if result.get("cached"):
+                self.log("ARCHITECT PRO", "Same request as before - reusing the generated code", "info")
             self.log(
                 "ARCHITECT PRO",
                 f"Code generated! Quality: {quality}% | File: {result.get('cpp_file')}",
@@ -745,18 +1024,13 @@ class EnhancedVibeApp(ctk.CTk):
                 
         except Exception as e:
             self.log("ERROR", f"Generation failed: {str(e)}", "error")
-        finally:
-            loop.close()
 
     def process_debug(self, error_message):
         """Debug and fix errors"""
         self.log("ERROR DOCTOR", "Analyzing error with AI...", "info")
         
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
         try:
-            result = loop.run_until_complete(
+            result = self.run_async(
                 self.workers.error_doctor_analyze(error_message)
             )
             
@@ -767,15 +1041,21 @@ class EnhancedVibeApp(ctk.CTk):
             # Display analysis
             self.display_error_analysis(result)
             
-            # Check if auto-fix was applied
-            if "auto_fix" in result and result["auto_fix"].get("success"):
+            # Check if auto-fix was applied (a cached result only repeats an earlier fix)
+            if result.get("cached") and result.get("auto_fix", {}).get("success"):
+                self.log(
+                    "ERROR DOCTOR",
+                    f"Already fixed earlier. File: {result['auto_fix'].get('saved_to')}",
+                    "info"
+                )
+            elif "auto_fix" in result and result["auto_fix"].get("success"):
                 self.log(
                     "ERROR DOCTOR",
                     f"✓ Error fixed automatically! File: {result['auto_fix'].get('saved_to')}",
                     "success"
                 )
-                current = int(self.stats_labels["Errors Fixed"].cget("text"))
-                self.update_stat("Errors Fixed", current + 1)
+                self._counts["Errors Fixed"] += 1
+                self.update_stat("Errors Fixed", self._counts["Errors Fixed"])
             else:
                 self.log(
                     "ERROR DOCTOR",
@@ -787,8 +1067,6 @@ class EnhancedVibeApp(ctk.CTk):
             
         except Exception as e:
             self.log("ERROR", f"Debug failed: {str(e)}", "error")
-        finally:
-            loop.close()
 
     def process_refine(self, feedback):
         """Refine existing code"""
@@ -798,11 +1076,8 @@ class EnhancedVibeApp(ctk.CTk):
         
         self.log("ARCHITECT PRO", f"Refining code (Iteration {self.iteration_count + 1})...", "info")
         
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
         try:
-            result = loop.run_until_complete(
+            result = self.run_async(
                 self.workers.refine_code(self.last_code_id, feedback)
             )
             
@@ -825,8 +1100,6 @@ class EnhancedVibeApp(ctk.CTk):
             
         except Exception as e:
             self.log("ERROR", f"Refinement failed: {str(e)}", "error")
-        finally:
-            loop.close()
 
     def process_build(self, prompt):
         """Generate build files"""
@@ -836,11 +1109,8 @@ class EnhancedVibeApp(ctk.CTk):
         
         self.log("BUILD MASTER", "Generating build files...", "info")
         
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
         try:
-            result = loop.run_until_complete(
+            result = self.run_async(
                 self.workers.generate_build_files(self.last_code_id)
             )
             
@@ -865,88 +1135,99 @@ class EnhancedVibeApp(ctk.CTk):
             
         except Exception as e:
             self.log("ERROR", f"Build file generation failed: {str(e)}", "error")
-        finally:
-            loop.close()
 
     def display_code(self, result):
-        """Display generated code in code viewer"""
+        """Display generated code in code viewer (the file is read off the Tk thread)"""
+        threading.Thread(
+            target=self._read_and_show,
+            args=(result.get("cpp_file", ""),),
+            daemon=True
+        ).start()
+
+    def _read_and_show(self, path):
+        """Read a generated file and hand its text to the Tk thread"""
+        try:
+            with open(path, 'r') as f:
+                code = f.read()
+        except OSError as e:
+            self.log("ERROR", f"Could not read {path}: {e}", "error")
+            return
+        self.after(0, self.show_code, code)
+
+    def show_code(self, code):
+        """Put code in the code viewer and switch to its tab"""
         self.code_viewer.delete("1.0", "end")
-        
-        with open(result.get("cpp_file", ""), 'r') as f:
-            code = f.read()
-            self.code_viewer.insert("1.0", code)
-        
+        self.code_viewer.insert("1.0", code)
         self.viewport_notebook.set("Generated Code")
 
     def display_validation(self, result):
         """Display validation results"""
-        self.validation_viewer.delete("1.0", "end")
-        
         validation = result.get("validation", {})
         quality_score = result.get("quality_score", 0)
         
-        output = f"CODE VALIDATION REPORT\n"
-        output += "=" * 50 + "\n\n"
-        output += f"Quality Score: {quality_score}%\n"
-        output += f"Requires Review: {result.get('requires_review', True)}\n\n"
+        # Collect the report and join it once
+        parts = [
+            "CODE VALIDATION REPORT\n",
+            "=" * 50 + "\n\n",
+            f"Quality Score: {quality_score}%\n",
+            f"Requires Review: {result.get('requires_review', True)}\n\n"
+        ]
         
         if validation.get("issues"):
-            output += "CRITICAL ISSUES:\n"
-            for issue in validation["issues"]:
-                output += f"  ❌ {issue}\n"
-            output += "\n"
+            parts.append("CRITICAL ISSUES:\n")
+            parts.extend(f"  ❌ {issue}\n" for issue in validation["issues"])
+            parts.append("\n")
         
         if validation.get("warnings"):
-            output += "WARNINGS:\n"
-            for warning in validation["warnings"]:
-                output += f"  ⚠️  {warning}\n"
-            output += "\n"
+            parts.append("WARNINGS:\n")
+            parts.extend(f"  ⚠️  {warning}\n" for warning in validation["warnings"])
+            parts.append("\n")
         
         if validation.get("suggestions"):
-            output += "SUGGESTIONS:\n"
-            for suggestion in validation["suggestions"]:
-                output += f"  💡 {suggestion}\n"
+            parts.append("SUGGESTIONS:\n")
+            parts.extend(f"  💡 {suggestion}\n" for suggestion in validation["suggestions"])
         
-        self.validation_viewer.insert("1.0", output)
+        self.validation_viewer.delete("1.0", "end")
+        self.validation_viewer.insert("1.0", "".join(parts))
 
     def display_error_analysis(self, result):
         """Display error analysis"""
-        self.validation_viewer.delete("1.0", "end")
-        
-        output = f"ERROR ANALYSIS REPORT\n"
-        output += "=" * 50 + "\n\n"
-        output += f"Severity: {result.get('severity', 'N/A').upper()}\n"
-        output += f"Category: {result.get('category', 'N/A')}\n"
-        output += f"Confidence: {result.get('confidence_score', 0)*100:.0f}%\n\n"
-        output += f"Summary: {result.get('summary', 'N/A')}\n\n"
-        output += f"Root Cause:\n{result.get('root_cause', 'N/A')}\n\n"
-        output += f"Explanation:\n{result.get('explanation', 'N/A')}\n\n"
+        parts = [
+            "ERROR ANALYSIS REPORT\n",
+            "=" * 50 + "\n\n",
+            f"Severity: {result.get('severity', 'N/A').upper()}\n",
+            f"Category: {result.get('category', 'N/A')}\n",
+            f"Confidence: {result.get('confidence_score', 0)*100:.0f}%\n\n",
+            f"Summary: {result.get('summary', 'N/A')}\n\n",
+            f"Root Cause:\n{result.get('root_cause', 'N/A')}\n\n",
+            f"Explanation:\n{result.get('explanation', 'N/A')}\n\n"
+        ]
         
         if result.get("suggested_fixes"):
-            output += "SUGGESTED FIXES:\n"
+            parts.append("SUGGESTED FIXES:\n")
             for i, fix in enumerate(result["suggested_fixes"], 1):
-                output += f"\n{i}. {fix.get('description', 'N/A')}\n"
-                output += f"   Confidence: {fix.get('confidence', 0)*100:.0f}%\n"
-                output += f"   Risk: {fix.get('risk_level', 'N/A')}\n"
+                parts.append(
+                    f"\n{i}. {fix.get('description', 'N/A')}\n"
+                    f"   Confidence: {fix.get('confidence', 0)*100:.0f}%\n"
+                    f"   Risk: {fix.get('risk_level', 'N/A')}\n"
+                )
         
-        self.validation_viewer.insert("1.0", output)
+        self.validation_viewer.delete("1.0", "end")
+        self.validation_viewer.insert("1.0", "".join(parts))
         self.viewport_notebook.set("Validation")
 
     def display_build_instructions(self, result):
         """Display build instructions"""
-        self.validation_viewer.delete("1.0", "end")
-        
-        output = "BUILD FILES GENERATED\n"
-        output += "=" * 50 + "\n\n"
+        parts = ["BUILD FILES GENERATED\n", "=" * 50 + "\n\n"]
         
         for filename, filepath in result.get("files", {}).items():
-            output += f"📄 {filename}\n"
-            output += f"   Location: {filepath}\n\n"
+            parts.append(f"📄 {filename}\n   Location: {filepath}\n\n")
         
-        output += "\nINSTRUCTIONS:\n"
-        output += result.get("instructions", "No instructions available")
+        parts.append("\nINSTRUCTIONS:\n")
+        parts.append(result.get("instructions", "No instructions available"))
         
-        self.validation_viewer.insert("1.0", output)
+        self.validation_viewer.delete("1.0", "end")
+        self.validation_viewer.insert("1.0", "".join(parts))
         self.viewport_notebook.set("Validation")
 
 if __name__ == "__main__":
@@ -19,6 +19,14 @@ import aiohttp
 from datetime import datetime
 from dotenv import load_dotenv
 from typing import Optional, Dict, List, Any
+from urllib.parse import urlsplit, urlunsplit
+
+# Optional libuv-backed event loop; falls back to the stdlib loop (e.g. on Windows)
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
 
 # Import our advanced modules
 import sys
@@ -27,20 +35,45 @@ sys.path.append(os.path.dirname(__file__))
 from advanced_ai_brain import AdvancedAIBrain, IntentType, ParsedIntent
 from live_visual_editor import LiveVisualEditor
 
+def _health_url(api_url):
+    """Health endpoint next to the API root: a trailing /api path segment is replaced by /health"""
+    parts = urlsplit(api_url)
+    path = parts.path.rstrip("/")
+    if path.endswith("/api"):
+        path = path[:-len("/api")]
+    return urlunsplit((parts.scheme, parts.netloc, path + "/health", "", ""))
+
 # --- CONFIGURATION ---
 load_dotenv()
 
 UNREAL_HOST = os.getenv("UNREAL_HOST", "127.0.0.1")
 UNREAL_PORT = int(os.getenv("UNREAL_PORT", 30010))
 CPP_AI_API_URL = os.getenv("CPP_AI_API_URL", "http://localhost:8000/api")
+CPP_AI_HEALTH_URL = _health_url(CPP_AI_API_URL)
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+# Demo mode: make the placeholder asset workers take as long as real generation would
+SIMULATE_LATENCY = bool(os.getenv("SIMULATE_LATENCY"))
+
+# Ensure directories (one stat each on normal launches; makedirs only when missing)
+OUTPUT_DIRS = (
+    "assets/models",
+    "assets/audio",
+    "assets/scripts",
+    "assets/code_generated",
+    "assets/build_files",
+)
+for _dir in OUTPUT_DIRS:
+    if not os.path.isdir(_dir):
+        os.makedirs(_dir, exist_ok=True)
+
+def _write_text(path, content):
+    """Write a generated file; called via asyncio.to_thread so the event loop keeps running"""
+    with open(path, 'w') as f:
+        f.write(content)
 
-# Ensure directories
-os.makedirs("assets/models", exist_ok=True)
-os.makedirs("assets/audio", exist_ok=True)
-os.makedirs("assets/scripts", exist_ok=True)
-os.makedirs("assets/code_generated", exist_ok=True)
-os.makedirs("assets/build_files", exist_ok=True)
+async def _read_json(response):
+    """Parse a JSON body straight from its bytes (response.json() strips and decodes extra copies first)"""
+    return json.loads(await response.read())
 
 # --- ENHANCED WORKERS ---
 class UltimateWorkers:
@@ -49,32 +82,58 @@ class UltimateWorkers:
         self.auth_token = auth_token
         self.session = None
         
+        # Intent type -> handler, resolved once instead of walking an if/elif chain
+        self._dispatch = {
+            IntentType.CODE_GENERATION: self.generate_code,
+            IntentType.CHARACTER_CREATION: self.create_character,
+            IntentType.ASSET_CREATION: self.create_asset,
+            IntentType.SCENE_BUILDING: self.create_scene,
+            IntentType.ERROR_FIXING: self.fix_error,
+            IntentType.CODE_REFINEMENT: self.refine_code,
+            IntentType.TESTING: self.run_tests
+        }
+        
     async def setup_session(self):
-        if not self.session:
+        """Setup async HTTP session (created once, on the app's shared event loop)"""
+        if not self.session or self.session.closed:
             headers = {}
             if self.auth_token:
                 headers["Authorization"] = f"Bearer {self.auth_token}"
-            self.session = aiohttp.ClientSession(headers=headers)
+            # Keep-alive pool reused by every call to the C++ AI API
+            connector = aiohttp.TCPConnector(
+                limit=100,
+                limit_per_host=20,
+                keepalive_timeout=120,
+                enable_cleanup_closed=True
+            )
+            # Fail fast on connect, but give long AI generations time to respond
+            timeout = aiohttp.ClientTimeout(total=None, sock_connect=5, sock_read=60)
+            self.session = aiohttp.ClientSession(connector=connector, headers=headers, timeout=timeout)
+    
+    async def close_session(self):
+        """Close async HTTP session"""
+        if self.session:
+            await self.session.close()
+            self.session = None
+    
+    async def warm_up(self, url):
+        """Open a keep-alive connection to the API before the first real request"""
+        await self.setup_session()
+        
+        try:
+            async with self.session.get(url, timeout=aiohttp.ClientTimeout(total=5)) as response:
+                # Read the body so the connection goes back to the pool instead of closing
+                await response.read()
+        except Exception:
+            pass  # API offline; the first request will connect on its own
     
     async def execute_intent(self, intent: ParsedIntent) -> Dict[str, Any]:
         """Execute parsed intent and return results"""
         
-        if intent.intent_type == IntentType.CODE_GENERATION:
-            return await self.generate_code(intent)
-        elif intent.intent_type == IntentType.CHARACTER_CREATION:
-            return await self.create_character(intent)
-        elif intent.intent_type == IntentType.ASSET_CREATION:
-            return await self.create_asset(intent)
-        elif intent.intent_type == IntentType.SCENE_BUILDING:
-            return await self.create_scene(intent)
-        elif intent.intent_type == IntentType.ERROR_FIXING:
-            return await self.fix_error(intent)
-        elif intent.intent_type == IntentType.CODE_REFINEMENT:
-            return await self.refine_code(intent)
-        elif intent.intent_type == IntentType.TESTING:
-            return await self.run_tests(intent)
-        else:
-            return {"error": f"Unknown intent type: {intent.intent_type}"}
+        handler = self._dispatch.get(intent.intent_type)
+        if handler:
+            return await handler(intent)
+        return {"error": f"Unknown intent type: {intent.intent_type}"}
     
     async def generate_code(self, intent: ParsedIntent) -> Dict[str, Any]:
         """Generate code based on intent"""
@@ -95,11 +154,10 @@ class UltimateWorkers:
                 }
             ) as response:
                 if response.status == 200:
-                    result = await response.json()
+                    result = await _read_json(response)
                     
                     filename = f"assets/code_generated/Generated_{int(time.time())}.cpp"
-                    with open(filename, 'w') as f:
-                        f.write(result.get("generated_code", ""))
+                    await asyncio.to_thread(_write_text, filename, result.get("generated_code", ""))
                     
                     return {
                         "success": True,
@@ -120,8 +178,9 @@ class UltimateWorkers:
         specs = intent.entities
         character_name = specs.get("asset_name", "Character")
         
-        # Simulate character creation (in production, call 3D generation API)
-        await asyncio.sleep(2)
+        # Placeholder character (in production, call 3D generation API)
+        if SIMULATE_LATENCY:
+            await asyncio.sleep(2)
         
         return {
             "success": True,
@@ -149,7 +208,8 @@ class UltimateWorkers:
         asset_type = specs.get("asset_type", "prop")
         asset_name = specs.get("asset_name", f"{asset_type}_01")
         
-        await asyncio.sleep(1.5)
+        if SIMULATE_LATENCY:
+            await asyncio.sleep(1.5)
         
         return {
             "success": True,
@@ -170,7 +230,8 @@ class UltimateWorkers:
         
         specs = intent.entities
         
-        await asyncio.sleep(2)
+        if SIMULATE_LATENCY:
+            await asyncio.sleep(2)
         
         return {
             "success": True,
@@ -198,7 +259,7 @@ class UltimateWorkers:
                 }
             ) as response:
                 if response.status == 200:
-                    result = await response.json()
+                    result = await _read_json(response)
                     return {
                         "success": True,
                         "type": "error_fix",
@@ -217,7 +278,8 @@ class UltimateWorkers:
     async def run_tests(self, intent: ParsedIntent) -> Dict[str, Any]:
         """Run automated tests"""
         
-        await asyncio.sleep(1)
+        if SIMULATE_LATENCY:
+            await asyncio.sleep(1)
         
         return {
             "success": True,
@@ -235,6 +297,43 @@ class UltimateWorkers:
         }
 
 # --- ULTIMATE GUI ---
+# Sidebar quick commands and example prompts, built once at import
+QUICK_COMMANDS = (
+    "Create a knight character",
+    "Make a medieval castle",
+    "Generate player controller code",
+    "Add flying ability",
+    "Create a landscape",
+)
+
+EXAMPLES = (
+    ("🎮 Characters", (
+        "Create a knight with a glowing sword",
+        "Make an enemy AI that patrols and attacks on sight",
+        "I need a female archer character with animations"
+    )),
+    ("🏗️ Buildings & Props", (
+        "Build me a medieval castle with towers",
+        "Create a futuristic building with neon lights",
+        "Make some rocks and trees for my forest scene"
+    )),
+    ("💻 Code", (
+        "Write code for a health system with regeneration",
+        "Create an inventory system that can hold 20 items",
+        "I need a day/night cycle with dynamic lighting"
+    )),
+    ("🔧 Modifications", (
+        "Make the castle bigger and add a drawbridge",
+        "Add fire damage to the sword",
+        "Make the character run faster"
+    )),
+    ("🐛 Debugging", (
+        "Fix this error: 'undefined reference to UWorld'",
+        "My character keeps falling through the floor",
+        "The game crashes when I spawn the enemy"
+    ))
+)
+
 ctk.set_appearance_mode("Dark")
 ctk.set_default_color_theme("dark-blue")
 
@@ -247,6 +346,25 @@ class UltimateVibeApp(ctk.CTk):
         self.workers = UltimateWorkers(CPP_AI_API_URL)
         self.visual_editor = None  # Created on demand
         
+        # One long-lived event loop for all AI/API calls, so HTTP sessions are reused
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        
+        # Requests are queued onto the loop and handled by consumer tasks. Keep one by default:
+        # every request reads and updates the same AdvancedAIBrain conversation context, so
+        # concurrent consumers would let a follow-up bind to another request's asset
+        self.intent_workers = 1
+        self._intent_queue = None
+        self._intent_tasks = []
+        # Quick commands clicked within batch_window seconds share one intent-parsing call
+        self.batch_window = 0.2
+        self.batch_size = 10
+        self._batch_queue = None
+        # Normalized prompts currently queued or running; repeats are dropped, not re-sent
+        self._inflight = set()
+        self._loop.call_soon_threadsafe(self._start_intent_workers)
+        asyncio.run_coroutine_threadsafe(self.workers.warm_up(CPP_AI_HEALTH_URL), self._loop)
+        
         # Window setup
         self.title("Unreal AI Architect | ULTIMATE EDITION")
         self.geometry("1200x800")
@@ -256,9 +374,7 @@ class UltimateVibeApp(ctk.CTk):
         self.grid_rowconfigure(0, weight=1)
 
         self.setup_ui()
-        
-        # Start AI response loop
-        self.processing = False
+        self.protocol("WM_DELETE_WINDOW", self.on_closing)
 
     def setup_ui(self):
         # --- SIDEBAR ---
@@ -292,15 +408,7 @@ class UltimateVibeApp(ctk.CTk):
             font=ctk.CTkFont(weight="bold")
         ).pack(pady=10)
         
-        quick_commands = [
-            "Create a knight character",
-            "Make a medieval castle",
-            "Generate player controller code",
-            "Add flying ability",
-            "Create a landscape"
-        ]
-        
-        for cmd in quick_commands:
+        for cmd in QUICK_COMMANDS:
             ctk.CTkButton(
                 commands_frame,
                 text=cmd,
@@ -347,42 +455,17 @@ class UltimateVibeApp(ctk.CTk):
         )
         examples_frame.grid(row=1, column=0, sticky="nsew", padx=20, pady=(0,20))
         
-        examples = [
-            ("🎮 Characters", [
-                "Create a knight with a glowing sword",
-                "Make an enemy AI that patrols and attacks on sight",
-                "I need a female archer character with animations"
-            ]),
-            ("🏗️ Buildings & Props", [
-                "Build me a medieval castle with towers",
-                "Create a futuristic building with neon lights",
-                "Make some rocks and trees for my forest scene"
-            ]),
-            ("💻 Code", [
-                "Write code for a health system with regeneration",
-                "Create an inventory system that can hold 20 items",
-                "I need a day/night cycle with dynamic lighting"
-            ]),
-            ("🔧 Modifications", [
-                "Make the castle bigger and add a drawbridge",
-                "Add fire damage to the sword",
-                "Make the character run faster"
-            ]),
-            ("🐛 Debugging", [
-                "Fix this error: 'undefined reference to UWorld'",
-                "My character keeps falling through the floor",
-                "The game crashes when I spawn the enemy"
-            ])
-        ]
+        # One font object for every category heading instead of one per label
+        heading_font = ctk.CTkFont(size=14, weight="bold")
         
-        for category, example_list in examples:
+        for category, example_list in EXAMPLES:
             category_frame = ctk.CTkFrame(examples_frame)
             category_frame.pack(fill="x", padx=10, pady=10)
             
             ctk.CTkLabel(
                 category_frame,
                 text=category,
-                font=ctk.CTkFont(size=14, weight="bold")
+                font=heading_font
             ).pack(anchor="w", padx=10, pady=5)
             
             for example in example_list:
@@ -445,7 +528,7 @@ class UltimateVibeApp(ctk.CTk):
             command=lambda: self.submit(None),
             fg_color="#06b6d4",
             text_color="black",
-            font=ctk.CTkFont(size=14, weight="bold")
+            font=heading_font
         )
         self.execute_btn.pack(side="left", padx=2)
         
@@ -468,52 +551,119 @@ class UltimateVibeApp(ctk.CTk):
         self.conversation.see("end")
         self.conversation.configure(state="disabled")
 
+    def _start_intent_workers(self):
+        """Create the request queue and its consumers (runs on the event loop)"""
+        self._intent_queue = asyncio.Queue()
+        self._batch_queue = asyncio.Queue()
+        self._intent_tasks = [
+            self._loop.create_task(self._intent_worker())
+            for _ in range(self.intent_workers)
+        ]
+        self._intent_tasks.append(self._loop.create_task(self._intent_batcher()))
+    
+    async def _stop_intent_workers(self):
+        """Cancel the consumers and wait for them to exit"""
+        for task in self._intent_tasks:
+            task.cancel()
+        await asyncio.gather(*self._intent_tasks, return_exceptions=True)
+    
+    async def _intent_worker(self):
+        """Handle queued requests one at a time"""
+        while True:
+            user_input, intent = await self._intent_queue.get()
+            try:
+                await self.process_natural_input(user_input, intent)
+            finally:
+                self._intent_queue.task_done()
+    
+    async def _intent_batcher(self):
+        """Parse quick commands that arrive together in one call, then queue them for the workers"""
+        while True:
+            batch = [await self._batch_queue.get()]
+            await asyncio.sleep(self.batch_window)
+            while len(batch) < self.batch_size and not self._batch_queue.empty():
+                batch.append(self._batch_queue.get_nowait())
+            
+            if len(batch) > 1:
+                self.after(0, self.log_conversation, "AI BRAIN", f"🧠 Understanding {len(batch)} requests together...")
+            try:
+                intents = await self.ai_brain.understand_inputs(batch)
+            except Exception as e:
+                print(f"Batch understanding error: {e}")
+                intents = [None] * len(batch)
+            
+            # A None intent (not parsed by the batch call) is parsed by its worker
+            for user_input, intent in zip(batch, intents):
+                self._intent_queue.put_nowait((user_input, intent))
+    
+    def on_closing(self):
+        """Stop the intent workers, close the HTTP sessions and stop the event loop"""
+        try:
+            asyncio.run_coroutine_threadsafe(self._stop_intent_workers(), self._loop).result(timeout=5)
+        except Exception as e:
+            print(f"Worker shutdown error: {e}")
+        for owner in (self.workers, self.ai_brain):
+            try:
+                asyncio.run_coroutine_threadsafe(owner.close_session(), self._loop).result(timeout=5)
+            except Exception as e:
+                print(f"Session close error: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self.destroy()
+
     def quick_command(self, command: str):
         """Execute a quick command"""
         self.entry.delete(0, "end")
         self.entry.insert(0, command)
-        self.submit(None)
+        self.submit(None, batch=True)
 
-    def submit(self, event):
-        """Process user input"""
-        if self.processing:
-            return
-            
+    def submit(self, event, batch=False):
+        """Process user input (batch=True lets it share intent parsing with nearby quick commands)"""
         user_input = self.entry.get()
         if not user_input.strip():
             return
         
         self.entry.delete(0, "end")
+        
+        # Repeated clicks on the same command share the request already in flight
+        key = " ".join(user_input.lower().split())
+        if key in self._inflight:
+            self.log_conversation("AI BRAIN", f"⏳ Already working on: {user_input}")
+            return
+        
         self.log_conversation("YOU", user_input)
         
-        # Disable button during processing
-        self.execute_btn.configure(state="disabled", text="⏳ Processing...")
-        self.processing = True
+        # Show progress while any request is in flight
+        self._inflight.add(key)
+        self.execute_btn.configure(text=f"⏳ Processing ({len(self._inflight)})...")
         
-        # Process in background
-        threading.Thread(
-            target=self.process_natural_input,
-            args=(user_input,),
-            daemon=True
-        ).start()
+        # Hand off to the event loop: quick commands via the batcher, typed input straight to the workers
+        if batch:
+            self._loop.call_soon_threadsafe(lambda: self._batch_queue.put_nowait(user_input))
+        else:
+            self._loop.call_soon_threadsafe(lambda: self._intent_queue.put_nowait((user_input, None)))
 
-    def process_natural_input(self, user_input: str):
-        """Process natural language input with AI brain"""
-        
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+    def finish_request(self, user_input: str):
+        """Update the Create button once a request has finished"""
+        self._inflight.discard(" ".join(user_input.lower().split()))
+        if self._inflight:
+            self.execute_btn.configure(text=f"⏳ Processing ({len(self._inflight)})...")
+        else:
+            self.execute_btn.configure(text="✨ Create")
+
+    async def process_natural_input(self, user_input: str, intent: Optional[ParsedIntent] = None):
+        """Process natural language input with AI brain (intent is passed in if already parsed)"""
         
+        follow_up = None
         try:
             # Step 1: Understand intent
-            self.after(0, lambda: self.log_conversation(
-                "AI BRAIN",
-                "🧠 Understanding your request...",
-                "info"
-            ))
-            
-            intent = loop.run_until_complete(
-                self.ai_brain.understand_input(user_input)
-            )
+            if intent is None:
+                self.after(0, lambda: self.log_conversation(
+                    "AI BRAIN",
+                    "🧠 Understanding your request...",
+                    "info"
+                ))
+                
+                intent = await self.ai_brain.understand_input(user_input)
             
             # Step 2: Check if clarification needed
             if intent.requires_clarification:
@@ -536,9 +686,7 @@ class UltimateVibeApp(ctk.CTk):
                 "⚙️ Creating what you requested..."
             ))
             
-            result = loop.run_until_complete(
-                self.workers.execute_intent(intent)
-            )
+            result = await self.workers.execute_intent(intent)
             
             if not result.get("success"):
                 self.after(0, lambda: self.log_conversation(
@@ -547,19 +695,20 @@ class UltimateVibeApp(ctk.CTk):
                 ))
                 return
             
+            # The follow-up reply only needs the result, so draft it while the tests run
+            follow_up = asyncio.create_task(
+                self.ai_brain.generate_follow_up_response(intent, result)
+            )
+            
             # Step 5: Generate tests
             self.after(0, lambda: self.log_conversation(
                 "TESTER",
                 "🧪 Running automated tests..."
             ))
             
-            test_plan = loop.run_until_complete(
-                self.ai_brain.generate_test_plan(intent, result)
-            )
+            test_plan = await self.ai_brain.generate_test_plan(intent, result)
             
-            test_results = loop.run_until_complete(
-                self.ai_brain.execute_automated_tests(test_plan, result.get("file", ""))
-            )
+            test_results = await self.ai_brain.execute_automated_tests(test_plan, result.get("file", ""))
             
             # Step 6: Show results
             result_type = result.get("type", "asset")
@@ -577,9 +726,7 @@ class UltimateVibeApp(ctk.CTk):
                 self.after(0, lambda: self.open_visual_editor_with_asset(result))
             
             # Step 8: Generate follow-up response
-            response = loop.run_until_complete(
-                self.ai_brain.generate_follow_up_response(intent, result)
-            )
+            response = await follow_up
             
             self.after(0, lambda: self.log_conversation("AI", response))
             
@@ -592,12 +739,13 @@ class UltimateVibeApp(ctk.CTk):
                 f"❌ Processing error: {str(e)}"
             ))
         finally:
-            loop.close()
-            self.after(0, lambda: self.execute_btn.configure(
-                state="normal",
-                text="✨ Create"
-            ))
-            self.processing = False
+            # A failed step must not orphan the follow-up draft (or leave its error unretrieved)
+            if follow_up is not None:
+                if not follow_up.done():
+                    follow_up.cancel()
+                elif not follow_up.cancelled():
+                    follow_up.exception()
+            self.after(0, self.finish_request, user_input)
 
     def open_visual_editor(self):
         """Open the visual editor window"""
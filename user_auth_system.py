@@ -4,13 +4,76 @@ Complete login/logout with automatic session tracking
 """
 
 import sqlite3
+import atexit
 import hashlib
+import hmac
+import os
+import re
 import secrets
+import threading
 import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List
 import json
 
+# scrypt cost for new and upgraded password hashes (~32 MB and tens of ms per hash);
+# raise n as hardware improves, older hashes are upgraded on the next successful login
+PASSWORD_KDF_PARAMS = {"alg": "scrypt", "n": 2 ** 15, "r": 8, "p": 1}
+
+# Salt for the throwaway hash computed when a login names an unknown user
+_DUMMY_SALT = bytes(32)
+
+# Compact encoder built once and shared by every stored JSON column
+_compact_json = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, check_circular=False).encode
+_KDF_PARAMS_JSON = _compact_json(PASSWORD_KDF_PARAMS)
+_DEFAULT_PREFERENCES_JSON = _compact_json({"theme": "dark", "auto_save": True, "notifications": True})
+
+# Hot-path statements, kept as constants so the connection's statement cache
+# always sees the identical SQL text and reuses the prepared statement
+_SQL_SELECT_LOGIN = "SELECT user_id, password_hash, salt, username, email, full_name, role, kdf_params FROM users WHERE username = ?"
+_SQL_INSERT_SESSION = """
+    INSERT INTO user_sessions (session_id, user_id, session_token, start_time, ip_address, status)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+_SQL_UPDATE_LOGIN = "UPDATE users SET last_login = ?, total_sessions = total_sessions + 1 WHERE user_id = ?"
+_SQL_UPDATE_PASSWORD = "UPDATE users SET password_hash = ?, salt = ?, kdf_params = ? WHERE user_id = ?"
+_SQL_END_SESSION = """
+    UPDATE user_sessions
+    SET end_time = ?, duration_seconds = ?, actions_log = ?,
+        assets_created = ?, errors_encountered = ?, features_used = ?, status = ?
+    WHERE session_id = ?
+"""
+_SQL_INSERT_ASSET = "INSERT INTO user_assets VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+# Multi-row asset insert: 12 columns x 41 rows stays under the 999-parameter limit of older SQLite builds
+_ASSET_INSERT_ROWS = min(50, 499 // 12)
+_SQL_INSERT_ASSETS = "INSERT INTO user_assets VALUES " + ", ".join(["(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"] * _ASSET_INSERT_ROWS)
+_SQL_ADD_USER_ASSETS = """
+    UPDATE users
+    SET total_assets_created = total_assets_created + ?,
+        storage_used_mb = storage_used_mb + ?
+    WHERE user_id = ?
+"""
+_SQL_INSERT_SHARED = "INSERT INTO shared_asset_library VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+_SQL_MARK_PUBLIC = "UPDATE user_assets SET is_public = 1 WHERE asset_id = ?"
+_SQL_USER_STATS = """
+    SELECT username, full_name, created_at, total_sessions, total_assets_created, storage_used_mb,
+           (SELECT COUNT(*) FROM shared_asset_library WHERE original_user_id = users.user_id)
+    FROM users WHERE user_id = ?
+"""
+_SQL_INSERT_EVENTS = "INSERT INTO session_events (session_id, ts, kind, payload) VALUES (?, ?, ?, ?)"
+_SQL_SELECT_EVENTS = "SELECT ts, kind, payload FROM session_events WHERE session_id = ? ORDER BY rowid"
+_SQL_EXPIRE_EVENTS = """
+    DELETE FROM session_events WHERE session_id IN (
+        SELECT session_id FROM user_sessions WHERE status = 'completed' AND end_time < ?
+    )
+"""
+
+# Column lists for reads, so rows only carry what the caller returns
+_ASSET_COLUMNS = "asset_id, asset_type, asset_name, asset_data, file_path, tags, is_public, created_at, usage_count"
+_SHARED_COLUMNS = "s.library_id, s.asset_name, s.asset_type, s.description, s.file_path, s.downloads, s.rating, s.tags"
+
 class UserAuthSystem:
     """
     Complete user authentication and session management
@@ -19,13 +82,52 @@ class UserAuthSystem:
     def __init__(self, db_path: str = "user_system.db"):
         self.db_path = db_path
         self.active_sessions = {}
+        
+        # user_id -> active session tokens, oldest login first
+        self._user_tokens: Dict[int, Dict[str, None]] = {}
+        
+        # Login rows by username: username -> (expires_at, row or None for unknown users), oldest first
+        self._user_cache: OrderedDict = OrderedDict()
+        self.user_cache_size = 1024
+        self.user_cache_ttl = 30
+        self._cache_lock = threading.Lock()
+        
+        # Random bytes for session/asset IDs, refilled from os.urandom in 4 KB blocks
+        self._rand_buf = bytearray()
+        self._rand_lock = threading.Lock()
+        
         self._init_database()
+        
+        # Tracked actions/assets/errors are queued here and written to session_events
+        # by a background thread every event_flush_interval seconds or event_flush_every rows
+        self._event_buffer: deque = deque()
+        self.event_flush_every = 1000
+        self.event_flush_interval = 5.0
+        self._flush_lock = threading.Lock()
+        self._flush_wakeup = threading.Event()
+        self._flush_stop = threading.Event()
+        self.checkpoint_interval = 60.0
+        self._last_checkpoint = time.monotonic()
+        # Seconds to keep the events of completed sessions after logout; None keeps them for good
+        self.event_retention: Optional[float] = None
+        self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flush_thread.start()
+        atexit.register(self.flush_events)
     
     def _init_database(self):
         """Initialize user database"""
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        # One long-lived connection shared by every caller, instead of one per method call
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
+        self._db_lock = threading.RLock()
+        
+        cursor = self._conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA cache_size=-40000")
+        # Let the WAL grow past the 1000-page default; the flush thread checkpoints it off the request path
+        cursor.execute("PRAGMA wal_autocheckpoint=10000")
         
         # Users table
         cursor.execute('''
@@ -34,7 +136,7 @@ class UserAuthSystem:
                 username TEXT UNIQUE NOT NULL,
                 email TEXT UNIQUE NOT NULL,
                 password_hash TEXT NOT NULL,
-                salt TEXT NOT NULL,
+                salt BLOB NOT NULL,
                 full_name TEXT,
                 role TEXT DEFAULT 'user',
                 created_at TEXT,
@@ -42,10 +144,16 @@ class UserAuthSystem:
                 total_sessions INTEGER DEFAULT 0,
                 total_assets_created INTEGER DEFAULT 0,
                 storage_used_mb REAL DEFAULT 0.0,
-                preferences TEXT
+                preferences TEXT,
+                kdf_params TEXT
             )
         ''')
         
+        # Databases created before the KDF change lack kdf_params; NULL marks a legacy SHA-256 hash
+        cursor.execute("SELECT 1 FROM pragma_table_info('users') WHERE name = 'kdf_params'")
+        if cursor.fetchone() is None:
+            cursor.execute("ALTER TABLE users ADD COLUMN kdf_params TEXT")
+        
         # Sessions table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS user_sessions (
@@ -105,8 +213,155 @@ class UserAuthSystem:
             )
         ''')
         
-        conn.commit()
-        conn.close()
+        # Tracked session events, appended in batches by the flush thread
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS session_events (
+                session_id TEXT,
+                ts REAL,
+                kind TEXT,
+                payload TEXT
+            )
+        ''')
+        
+        # Indexes for the per-user asset listings/stats and the library ranking;
+        # users.username is already indexed by its UNIQUE constraint
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_assets_user_time ON user_assets(user_id, created_at DESC)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_assets_user_type_time ON user_assets(user_id, asset_type, created_at DESC)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_shared_rank ON shared_asset_library(downloads DESC, rating DESC)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_shared_owner ON shared_asset_library(original_user_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_session ON session_events(session_id)")
+        
+        # Full-text index for library searches
+        self._fts_enabled = self._create_shared_fts(cursor)
+        
+        self._conn.commit()
+    
+    def _create_shared_fts(self, cursor) -> bool:
+        """Create the FTS5 index over the shared library text columns, kept in sync by triggers"""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'shared_fts'")
+        exists = cursor.fetchone() is not None
+        
+        try:
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS shared_fts
+                USING fts5(asset_name, description, tags, content='shared_asset_library', content_rowid='rowid')
+            ''')
+        except sqlite3.OperationalError as e:
+            # SQLite built without FTS5 - searches fall back to LIKE
+            print(f"Full-text index unavailable: {e}")
+            return False
+        
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS shared_fts_ai AFTER INSERT ON shared_asset_library BEGIN
+                INSERT INTO shared_fts(rowid, asset_name, description, tags)
+                VALUES (new.rowid, new.asset_name, new.description, new.tags);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS shared_fts_ad AFTER DELETE ON shared_asset_library BEGIN
+                INSERT INTO shared_fts(shared_fts, rowid, asset_name, description, tags)
+                VALUES ('delete', old.rowid, old.asset_name, old.description, old.tags);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS shared_fts_au AFTER UPDATE OF asset_name, description, tags ON shared_asset_library BEGIN
+                INSERT INTO shared_fts(shared_fts, rowid, asset_name, description, tags)
+                VALUES ('delete', old.rowid, old.asset_name, old.description, old.tags);
+                INSERT INTO shared_fts(rowid, asset_name, description, tags)
+                VALUES (new.rowid, new.asset_name, new.description, new.tags);
+            END
+        ''')
+        
+        # Index rows shared before the full-text table existed
+        if not exists:
+            cursor.execute("INSERT INTO shared_fts(shared_fts) VALUES ('rebuild')")
+        
+        return True
+    
+    def _fts_query(self, text: str) -> Optional[str]:
+        """Build an FTS5 query matching every word of text as a prefix"""
+        tokens = re.findall(r"\w+", text)
+        if not tokens:
+            return None
+        return " ".join(f'"{token}"*' for token in tokens)
+    
+    @contextmanager
+    def _cursor(self):
+        """Cursor on the shared connection, held under the database lock"""
+        with self._db_lock:
+            cursor = self._conn.cursor()
+            try:
+                yield cursor
+            except Exception:
+                # Don't leave a half-written transaction open on the shared connection
+                self._conn.rollback()
+                raise
+    
+    @contextmanager
+    def _transaction(self):
+        """Cursor inside one BEGIN IMMEDIATE ... COMMIT; rolled back by _cursor on error"""
+        with self._cursor() as cursor:
+            cursor.execute("BEGIN IMMEDIATE")
+            yield cursor
+            self._conn.commit()
+    
+    def close(self):
+        """Stop the flush thread, write pending events and close the user database"""
+        self._flush_stop.set()
+        self._flush_wakeup.set()
+        self._flush_thread.join()
+        self.flush_events()
+        atexit.unregister(self.flush_events)
+        with self._db_lock:
+            self._conn.close()
+    
+    def _flush_loop(self):
+        """Background writer for tracked session events and WAL checkpoints"""
+        while not self._flush_stop.is_set():
+            self._flush_wakeup.wait(self.event_flush_interval)
+            self._flush_wakeup.clear()
+            try:
+                self.flush_events()
+                if time.monotonic() - self._last_checkpoint >= self.checkpoint_interval:
+                    if self.event_retention is not None:
+                        self._expire_events()
+                    self._checkpoint()
+            except sqlite3.Error as e:
+                print(f"Background database write failed: {e}")
+    
+    def _expire_events(self):
+        """Delete the events of sessions that ended more than event_retention seconds ago"""
+        cutoff = datetime.fromtimestamp(time.time() - self.event_retention).isoformat()
+        with self._transaction() as cursor:
+            cursor.execute(_SQL_EXPIRE_EVENTS, (cutoff,))
+    
+    def _checkpoint(self):
+        """Copy committed WAL pages back into the database without blocking readers or writers"""
+        with self._cursor() as cursor:
+            cursor.execute("PRAGMA wal_checkpoint(PASSIVE)")
+        self._last_checkpoint = time.monotonic()
+    
+    def flush_events(self):
+        """Write queued session events in one transaction"""
+        with self._flush_lock:
+            buffer = self._event_buffer
+            if not buffer:
+                return
+            
+            batch = [buffer.popleft() for _ in range(len(buffer))]
+            try:
+                with self._transaction() as cursor:
+                    cursor.executemany(_SQL_INSERT_EVENTS, batch)
+            except sqlite3.Error:
+                # Keep the events queued, in order, for the next flush
+                buffer.extendleft(reversed(batch))
+                raise
+    
+    def _queue_event(self, session_id: str, kind: str, payload: Any):
+        """Queue one tracked event, waking the flush thread once enough are pending"""
+        self._event_buffer.append((session_id, time.time(), kind, _compact_json(payload)))
+        if len(self._event_buffer) >= self.event_flush_every:
+            self._flush_wakeup.set()
     
     def register_user(
         self,
@@ -125,28 +380,30 @@ class UserAuthSystem:
             return {"success": False, "error": "Password must be at least 8 characters"}
         
         # Generate salt and hash password
-        salt = secrets.token_hex(32)
+        salt = secrets.token_bytes(32)
         password_hash = self._hash_password(password, salt)
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute('''
-                INSERT INTO users (username, email, password_hash, salt, full_name, created_at, preferences)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                username,
-                email,
-                password_hash,
-                salt,
-                full_name or username,
-                datetime.now().isoformat(),
-                json.dumps({"theme": "dark", "auto_save": True, "notifications": True})
-            ))
+            with self._cursor() as cursor:
+                cursor.execute('''
+                    INSERT INTO users (username, email, password_hash, salt, full_name, created_at, preferences, kdf_params)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    username,
+                    email,
+                    password_hash,
+                    salt,
+                    full_name or username,
+                    datetime.now().isoformat(),
+                    _DEFAULT_PREFERENCES_JSON,
+                    _KDF_PARAMS_JSON
+                ))
+                
+                user_id = cursor.lastrowid
+                self._conn.commit()
             
-            user_id = cursor.lastrowid
-            conn.commit()
+            # Drop any cached "unknown user" entry for the new name
+            self._invalidate_user(username)
             
             return {
                 "success": True,
@@ -160,8 +417,6 @@ class UserAuthSystem:
                 "success": False,
                 "error": "Username or email already exists"
             }
-        finally:
-            conn.close()
     
     def login(
         self,
@@ -171,65 +426,71 @@ class UserAuthSystem:
     ) -> Dict[str, Any]:
         """User login"""
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "SELECT user_id, password_hash, salt, username, email, full_name, role FROM users WHERE username = ?",
-            (username,)
-        )
-        
-        user = cursor.fetchone()
+        user = self._get_user_row(username)
         
         if not user:
-            conn.close()
+            # Spend the same KDF time as a real check so response timing doesn't reveal unknown usernames
+            self._hash_password(password, _DUMMY_SALT)
             return {"success": False, "error": "Invalid username or password"}
         
-        # Verify password
-        user_id, stored_hash, salt, username, email, full_name, role = user
-        password_hash = self._hash_password(password, salt)
+        # Verify password with the parameters it was hashed under
+        user_id, stored_hash, salt, username, email, full_name, role, kdf_params = user
+        kdf_params = json.loads(kdf_params) if kdf_params else None
+        if kdf_params:
+            password_hash = self._hash_password(password, salt, kdf_params)
+        else:
+            password_hash = self._legacy_hash_password(password, salt)
         
-        if password_hash != stored_hash:
-            conn.close()
+        if not hmac.compare_digest(password_hash, stored_hash):
             return {"success": False, "error": "Invalid username or password"}
         
+        # Re-hash legacy or weaker hashes under the current policy while the password is at hand
+        rehash = None
+        if kdf_params != PASSWORD_KDF_PARAMS:
+            new_salt = secrets.token_bytes(32)
+            rehash = (self._hash_password(password, new_salt), new_salt, _KDF_PARAMS_JSON, user_id)
+        
         # Generate session token
         session_token = secrets.token_urlsafe(32)
         session_id = self._generate_session_id()
         
-        # Create session
-        cursor.execute('''
-            INSERT INTO user_sessions (session_id, user_id, session_token, start_time, ip_address, status)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (
-            session_id,
-            user_id,
-            session_token,
-            datetime.now().isoformat(),
-            ip_address,
-            "active"
-        ))
-        
-        # Update last login
-        cursor.execute(
-            "UPDATE users SET last_login = ?, total_sessions = total_sessions + 1 WHERE user_id = ?",
-            (datetime.now().isoformat(), user_id)
-        )
-        
-        conn.commit()
-        conn.close()
+        # One clock read for the stored and in-memory start time
+        start_time = time.time()
+        start_iso = datetime.fromtimestamp(start_time).isoformat()
+        
+        with self._transaction() as cursor:
+            # Create session
+            cursor.execute(_SQL_INSERT_SESSION, (
+                session_id,
+                user_id,
+                session_token,
+                start_iso,
+                ip_address,
+                "active"
+            ))
+            
+            # Update last login
+            cursor.execute(_SQL_UPDATE_LOGIN, (start_iso, user_id))
+            
+            if rehash:
+                cursor.execute(_SQL_UPDATE_PASSWORD, rehash)
+        
+        if rehash:
+            self._invalidate_user(username)
         
         # Store active session
         self.active_sessions[session_token] = {
             "session_id": session_id,
             "user_id": user_id,
             "username": username,
-            "start_time": time.time(),
-            "actions": [],
-            "assets_created": [],
-            "errors": [],
+            "start_time": start_time,
+            # Actions, assets and errors go to session_events; only counts stay in memory
+            "actions_count": 0,
+            "assets_count": 0,
+            "errors_count": 0,
             "features_used": set()
         }
+        self._user_tokens.setdefault(user_id, {})[session_token] = None
         
         return {
             "success": True,
@@ -241,46 +502,83 @@ class UserAuthSystem:
             "role": role
         }
     
+    def _get_user_row(self, username: str) -> Optional[tuple]:
+        """Login row for username, served from the TTL cache when fresh; misses are cached too"""
+        now = time.monotonic()
+        with self._cache_lock:
+            entry = self._user_cache.get(username)
+            if entry is not None and entry[0] >= now:
+                self._user_cache.move_to_end(username)
+                return entry[1]
+        
+        with self._cursor() as cursor:
+            cursor.execute(_SQL_SELECT_LOGIN, (username,))
+            user = cursor.fetchone()
+        
+        with self._cache_lock:
+            self._user_cache[username] = (now + self.user_cache_ttl, user)
+            self._user_cache.move_to_end(username)
+            while len(self._user_cache) > self.user_cache_size:
+                self._user_cache.popitem(last=False)
+        
+        return user
+    
+    def _invalidate_user(self, username: str):
+        """Forget the cached login row for username"""
+        with self._cache_lock:
+            self._user_cache.pop(username, None)
+    
     def logout(
         self,
         session_token: str
     ) -> Dict[str, Any]:
         """User logout - returns session data for analysis"""
         
-        if session_token not in self.active_sessions:
+        # Remove from active sessions
+        session_data = self.active_sessions.pop(session_token, None)
+        if session_data is None:
             return {"success": False, "error": "Invalid session"}
         
-        session_data = self.active_sessions[session_token]
+        user_tokens = self._user_tokens.get(session_data["user_id"])
+        if user_tokens is not None:
+            user_tokens.pop(session_token, None)
+            if not user_tokens:
+                del self._user_tokens[session_data["user_id"]]
+        
         session_id = session_data["session_id"]
         
         # Calculate duration
-        duration = time.time() - session_data["start_time"]
-        
-        # Update session in database
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE user_sessions
-            SET end_time = ?, duration_seconds = ?, actions_log = ?, 
-                assets_created = ?, errors_encountered = ?, features_used = ?, status = ?
-            WHERE session_id = ?
-        ''', (
-            datetime.now().isoformat(),
-            int(duration),
-            json.dumps(session_data["actions"]),
-            json.dumps(session_data["assets_created"]),
-            json.dumps(session_data["errors"]),
-            json.dumps(list(session_data["features_used"])),
-            "completed",
-            session_id
-        ))
-        
-        conn.commit()
-        conn.close()
-        
-        # Remove from active sessions
-        del self.active_sessions[session_token]
+        end_time = time.time()
+        end_iso = datetime.fromtimestamp(end_time).isoformat()
+        duration = end_time - session_data["start_time"]
+        
+        # Write this session's queued events, then read its full log back
+        self.flush_events()
+        actions, assets_created, errors = [], [], []
+        with self._cursor() as cursor:
+            cursor.execute(_SQL_SELECT_EVENTS, (session_id,))
+            for ts, kind, payload in cursor:
+                if kind == "action":
+                    action_type, details = json.loads(payload)
+                    actions.append({"type": action_type, "details": details, "timestamp": ts})
+                elif kind == "asset":
+                    assets_created.append(json.loads(payload))
+                else:
+                    errors.append(json.loads(payload))
+            
+            # Update session in database; the per-event detail stays in session_events
+            cursor.execute(_SQL_END_SESSION, (
+                end_iso,
+                int(duration),
+                _compact_json({"count": session_data["actions_count"]}),
+                _compact_json({"count": session_data["assets_count"]}),
+                _compact_json({"count": session_data["errors_count"]}),
+                _compact_json(list(session_data["features_used"])),
+                "completed",
+                session_id
+            ))
+            
+            self._conn.commit()
         
         return {
             "success": True,
@@ -288,11 +586,11 @@ class UserAuthSystem:
                 "session_id": session_id,
                 "user_id": session_data["user_id"],
                 "start_time": datetime.fromtimestamp(session_data["start_time"]).isoformat(),
-                "end_time": datetime.now().isoformat(),
+                "end_time": end_iso,
                 "duration": duration,
-                "actions": session_data["actions"],
-                "assets_created": session_data["assets_created"],
-                "errors": session_data["errors"],
+                "actions": actions,
+                "assets_created": assets_created,
+                "errors": errors,
                 "features_used": list(session_data["features_used"])
             }
         }
@@ -305,12 +603,11 @@ class UserAuthSystem:
     ):
         """Track user action in session"""
         
-        if session_token in self.active_sessions:
-            self.active_sessions[session_token]["actions"].append({
-                "type": action_type,
-                "details": details,
-                "timestamp": time.time()
-            })
+        session = self.active_sessions.get(session_token)
+        if session is not None:
+            session["actions_count"] += 1
+            # Positional [type, details] pair: no dict per event and no repeated keys in the row
+            self._queue_event(session["session_id"], "action", (action_type, details))
     
     def track_asset_created(
         self,
@@ -319,8 +616,28 @@ class UserAuthSystem:
     ):
         """Track asset creation"""
         
-        if session_token in self.active_sessions:
-            self.active_sessions[session_token]["assets_created"].append(asset_data)
+        session = self.active_sessions.get(session_token)
+        if session is not None:
+            session["assets_count"] += 1
+            self._queue_event(session["session_id"], "asset", asset_data)
+    
+    def get_user_sessions(self, user_id: int) -> List[str]:
+        """Active session tokens for user, oldest login first"""
+        return list(self._user_tokens.get(user_id, ()))
+    
+    def track_user_asset_created(
+        self,
+        user_id: int,
+        asset_data: Dict[str, Any]
+    ) -> bool:
+        """Track asset creation against the user's most recent active session"""
+        
+        user_tokens = self._user_tokens.get(user_id)
+        if not user_tokens:
+            return False
+        
+        self.track_asset_created(next(reversed(user_tokens)), asset_data)
+        return True
     
     def track_feature_used(
         self,
@@ -329,8 +646,9 @@ class UserAuthSystem:
     ):
         """Track feature usage"""
         
-        if session_token in self.active_sessions:
-            self.active_sessions[session_token]["features_used"].add(feature_name)
+        session = self.active_sessions.get(session_token)
+        if session is not None:
+            session["features_used"].add(feature_name)
     
     def track_error(
         self,
@@ -339,8 +657,10 @@ class UserAuthSystem:
     ):
         """Track error occurrence"""
         
-        if session_token in self.active_sessions:
-            self.active_sessions[session_token]["errors"].append(error_data)
+        session = self.active_sessions.get(session_token)
+        if session is not None:
+            session["errors_count"] += 1
+            self._queue_event(session["session_id"], "error", error_data)
     
     def save_user_asset(
         self,
@@ -358,39 +678,80 @@ class UserAuthSystem:
         
         # Calculate file size (simplified)
         file_size_mb = 0.1  # Placeholder
+        now = datetime.now().isoformat()
+        
+        with self._transaction() as cursor:
+            cursor.execute(_SQL_INSERT_ASSET, (
+                asset_id,
+                user_id,
+                asset_type,
+                asset_name,
+                _compact_json(asset_data),
+                file_path,
+                file_size_mb,
+                _compact_json(tags or []),
+                int(is_public),
+                now,
+                now,
+                0
+            ))
+            
+            # Update user stats
+            cursor.execute(_SQL_ADD_USER_ASSETS, (1, file_size_mb, user_id))
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO user_assets VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            asset_id,
-            user_id,
-            asset_type,
-            asset_name,
-            json.dumps(asset_data),
-            file_path,
-            file_size_mb,
-            json.dumps(tags or []),
-            1 if is_public else 0,
-            datetime.now().isoformat(),
-            datetime.now().isoformat(),
-            0
-        ))
-        
-        # Update user stats
-        cursor.execute('''
-            UPDATE users 
-            SET total_assets_created = total_assets_created + 1,
-                storage_used_mb = storage_used_mb + ?
-            WHERE user_id = ?
-        ''', (file_size_mb, user_id))
+        return asset_id
+    
+    def save_user_assets(
+        self,
+        user_id: int,
+        assets: List[Dict[str, Any]]
+    ) -> List[str]:
+        """
+        Save several user assets in one transaction
+        Each dict takes the save_user_asset arguments: asset_type, asset_name,
+        asset_data, file_path, and optionally tags and is_public
+        """
+        
+        file_size_mb = 0.1  # Placeholder, as in save_user_asset
+        now = datetime.now().isoformat()
+        
+        asset_ids = []
+        rows = []
+        for asset in assets:
+            asset_id = self._generate_asset_id()
+            asset_ids.append(asset_id)
+            rows.append((
+                asset_id,
+                user_id,
+                asset["asset_type"],
+                asset["asset_name"],
+                _compact_json(asset["asset_data"]),
+                asset["file_path"],
+                file_size_mb,
+                _compact_json(asset.get("tags") or []),
+                int(bool(asset.get("is_public"))),
+                now,
+                now,
+                0
+            ))
         
-        conn.commit()
-        conn.close()
+        if not rows:
+            return asset_ids
+        
+        full = len(rows) - len(rows) % _ASSET_INSERT_ROWS
+        with self._transaction() as cursor:
+            # Full chunks through the prepared multi-row statement, the remainder row by row
+            for start in range(0, full, _ASSET_INSERT_ROWS):
+                cursor.execute(
+                    _SQL_INSERT_ASSETS,
+                    [value for row in rows[start:start + _ASSET_INSERT_ROWS] for value in row]
+                )
+            cursor.executemany(_SQL_INSERT_ASSET, rows[full:])
+            
+            # Update user stats once for the whole batch
+            cursor.execute(_SQL_ADD_USER_ASSETS, (len(rows), file_size_mb * len(rows), user_id))
         
-        return asset_id
+        return asset_ids
     
     def get_user_assets(
         self,
@@ -399,35 +760,28 @@ class UserAuthSystem:
     ) -> List[Dict[str, Any]]:
         """Get all assets created by user"""
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        if asset_type:
-            cursor.execute(
-                "SELECT * FROM user_assets WHERE user_id = ? AND asset_type = ? ORDER BY created_at DESC",
-                (user_id, asset_type)
-            )
-        else:
-            cursor.execute(
-                "SELECT * FROM user_assets WHERE user_id = ? ORDER BY created_at DESC",
-                (user_id,)
-            )
-        
         assets = []
-        for row in cursor.fetchall():
-            assets.append({
-                "asset_id": row[0],
-                "asset_type": row[2],
-                "asset_name": row[3],
-                "asset_data": json.loads(row[4]),
-                "file_path": row[5],
-                "tags": json.loads(row[7]),
-                "is_public": bool(row[8]),
-                "created_at": row[9],
-                "usage_count": row[11]
-            })
+        with self._cursor() as cursor:
+            # Name-addressable rows, converted one at a time as the cursor steps
+            cursor.row_factory = sqlite3.Row
+            if asset_type:
+                cursor.execute(
+                    f"SELECT {_ASSET_COLUMNS} FROM user_assets WHERE user_id = ? AND asset_type = ? ORDER BY created_at DESC",
+                    (user_id, asset_type)
+                )
+            else:
+                cursor.execute(
+                    f"SELECT {_ASSET_COLUMNS} FROM user_assets WHERE user_id = ? ORDER BY created_at DESC",
+                    (user_id,)
+                )
+            
+            for row in cursor:
+                asset = dict(row)
+                asset["asset_data"] = json.loads(row["asset_data"])
+                asset["tags"] = json.loads(row["tags"])
+                asset["is_public"] = bool(row["is_public"])
+                assets.append(asset)
         
-        conn.close()
         return assets
     
     def share_asset_to_library(
@@ -437,43 +791,40 @@ class UserAuthSystem:
     ) -> bool:
         """Share user asset to community library"""
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Get asset
-        cursor.execute("SELECT * FROM user_assets WHERE asset_id = ?", (asset_id,))
-        asset = cursor.fetchone()
-        
-        if not asset:
-            conn.close()
-            return False
-        
-        # Add to shared library
-        library_id = self._generate_asset_id()
-        
-        cursor.execute('''
-            INSERT INTO shared_asset_library VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            library_id,
-            asset[0],  # asset_id
-            asset[1],  # user_id
-            asset[3],  # asset_name
-            asset[2],  # asset_type
-            description,
-            None,  # preview_image
-            asset[5],  # file_path
-            0,  # downloads
-            0.0,  # rating
-            0,  # ratings_count
-            asset[7],  # tags
-            datetime.now().isoformat()
-        ))
-        
-        # Mark asset as public
-        cursor.execute("UPDATE user_assets SET is_public = 1 WHERE asset_id = ?", (asset_id,))
-        
-        conn.commit()
-        conn.close()
+        with self._transaction() as cursor:
+            # Get asset
+            cursor.execute(
+                "SELECT user_id, asset_type, asset_name, file_path, tags FROM user_assets WHERE asset_id = ?",
+                (asset_id,)
+            )
+            asset = cursor.fetchone()
+            
+            if not asset:
+                return False
+            
+            user_id, asset_type, asset_name, file_path, tags = asset
+            
+            # Add to shared library
+            library_id = self._generate_asset_id()
+            
+            cursor.execute(_SQL_INSERT_SHARED, (
+                library_id,
+                asset_id,
+                user_id,
+                asset_name,
+                asset_type,
+                description,
+                None,  # preview_image
+                file_path,
+                0,  # downloads
+                0.0,  # rating
+                0,  # ratings_count
+                tags,
+                datetime.now().isoformat()
+            ))
+            
+            # Mark asset as public
+            cursor.execute(_SQL_MARK_PUBLIC, (asset_id,))
         
         return True
     
@@ -485,89 +836,115 @@ class UserAuthSystem:
     ) -> List[Dict[str, Any]]:
         """Search community asset library"""
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        match = self._fts_query(query) if query and self._fts_enabled else None
         
         # Build query
-        sql = "SELECT * FROM shared_asset_library WHERE 1=1"
-        params = []
-        
-        if query:
-            sql += " AND (asset_name LIKE ? OR description LIKE ?)"
-            params.extend([f"%{query}%", f"%{query}%"])
+        if match:
+            sql = (
+                f"SELECT {_SHARED_COLUMNS} FROM shared_fts f JOIN shared_asset_library s ON s.rowid = f.rowid "
+                "WHERE shared_fts MATCH ?"
+            )
+            params = [match]
+        else:
+            sql = f"SELECT {_SHARED_COLUMNS} FROM shared_asset_library s WHERE 1=1"
+            params = []
+            
+            if query:
+                # One pattern over both columns instead of an OR of two LIKE scans
+                sql += " AND (ifnull(asset_name, '') || ' ' || ifnull(description, '')) LIKE ?"
+                params.append(f"%{query}%")
         
         if asset_type:
-            sql += " AND asset_type = ?"
+            sql += " AND s.asset_type = ?"
             params.append(asset_type)
         
-        sql += " ORDER BY downloads DESC, rating DESC LIMIT 100"
+        if match:
+            sql += " ORDER BY bm25(shared_fts), s.downloads DESC LIMIT 100"
+        else:
+            sql += " ORDER BY downloads DESC, rating DESC LIMIT 100"
         
-        cursor.execute(sql, params)
+        with self._cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
         
         assets = []
-        for row in cursor.fetchall():
+        for library_id, asset_name, asset_type, description, file_path, downloads, rating, tags in rows:
             assets.append({
-                "library_id": row[0],
-                "asset_name": row[3],
-                "asset_type": row[4],
-                "description": row[5],
-                "file_path": row[7],
-                "downloads": row[8],
-                "rating": row[9],
-                "tags": json.loads(row[11]) if row[11] else []
+                "library_id": library_id,
+                "asset_name": asset_name,
+                "asset_type": asset_type,
+                "description": description,
+                "file_path": file_path,
+                "downloads": downloads,
+                "rating": rating,
+                "tags": json.loads(tags) if tags else []
             })
         
-        conn.close()
         return assets
     
     def get_user_stats(self, user_id: int) -> Dict[str, Any]:
         """Get user statistics"""
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM users WHERE user_id = ?", (user_id,))
-        user = cursor.fetchone()
-        
-        if not user:
-            conn.close()
-            return {}
-        
-        cursor.execute(
-            "SELECT COUNT(*), asset_type FROM user_assets WHERE user_id = ? GROUP BY asset_type",
-            (user_id,)
-        )
-        
-        assets_by_type = {row[1]: row[0] for row in cursor.fetchall()}
-        
-        cursor.execute(
-            "SELECT COUNT(*) FROM shared_asset_library WHERE original_user_id = ?",
-            (user_id,)
-        )
-        
-        shared_count = cursor.fetchone()[0]
-        
-        conn.close()
+        with self._cursor() as cursor:
+            # User row and shared count in one statement; the count rides idx_shared_owner
+            cursor.execute(_SQL_USER_STATS, (user_id,))
+            user = cursor.fetchone()
+            
+            if not user:
+                return {}
+            
+            cursor.execute(
+                "SELECT asset_type, COUNT(*) FROM user_assets WHERE user_id = ? GROUP BY asset_type",
+                (user_id,)
+            )
+            
+            assets_by_type = dict(cursor)
         
+        username, full_name, member_since, total_sessions, total_assets, storage_used_mb, shared_count = user
         return {
-            "username": user[1],
-            "full_name": user[5],
-            "member_since": user[7],
-            "total_sessions": user[9],
-            "total_assets": user[10],
-            "storage_used_mb": user[11],
+            "username": username,
+            "full_name": full_name,
+            "member_since": member_since,
+            "total_sessions": total_sessions,
+            "total_assets": total_assets,
+            "storage_used_mb": storage_used_mb,
             "assets_by_type": assets_by_type,
             "shared_assets": shared_count
         }
     
-    def _hash_password(self, password: str, salt: str) -> str:
-        """Hash password with salt"""
+    def _hash_password(self, password: str, salt: bytes, kdf_params: Dict[str, Any] = PASSWORD_KDF_PARAMS) -> str:
+        """Hash password with salt using scrypt (memory-hard, cost set by kdf_params)"""
+        if isinstance(salt, str):
+            # Hashes written before salts were stored as raw bytes
+            salt = bytes.fromhex(salt)
+        n, r, p = kdf_params["n"], kdf_params["r"], kdf_params["p"]
+        return hashlib.scrypt(
+            password.encode(),
+            salt=salt,
+            n=n,
+            r=r,
+            p=p,
+            maxmem=256 * n * r * p,  # scrypt needs ~128*n*r bytes; the default 32 MB cap is too tight
+            dklen=32
+        ).hex()
+    
+    def _legacy_hash_password(self, password: str, salt: str) -> str:
+        """SHA-256 hash used before scrypt; only verified, never written"""
         return hashlib.sha256((password + salt).encode()).hexdigest()
     
+    def _take_bytes(self, n: int) -> bytes:
+        """Take n random bytes from the buffer, refilling it with one urandom call when short"""
+        with self._rand_lock:
+            if len(self._rand_buf) < n:
+                self._rand_buf += os.urandom(4096)
+            chunk = bytes(self._rand_buf[:n])
+            del self._rand_buf[:n]
+            return chunk
+    
     def _generate_session_id(self) -> str:
         """Generate session ID"""
-        return f"sess_{secrets.token_hex(16)}"
+        return "sess_" + self._take_bytes(16).hex()
     
     def _generate_asset_id(self) -> str:
         """Generate asset ID"""
-        return f"asset_{secrets.token_hex(12)}"
+        return "asset_" + self._take_bytes(12).hex()